@@ -0,0 +1,72 @@
+"""Benchmark checking the commit messages of a long history.
+
+The history is written with git fast-import, a tenth of the messages not
+following Conventional Commits. Run from the repository root:
+
+    python -m bench.commit_range --commits 10000 100000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import List
+
+from bench import generators
+from hooks import conventional_pre_commit
+
+
+def make_history(directory: Path, commits: int) -> None:
+    """Create a repository with ``commits`` empty commits on main."""
+    subprocess.run(["git", "init", "-q", str(directory)], check=True)
+    rng = random.Random(0)
+    stream = io.BytesIO()
+    for i in range(commits):
+        message = generators.commit_message(rng, rng.random() >= 0.1)
+        data = message.encode("utf-8")
+        stream.write(b"commit refs/heads/main\n")
+        stream.write(f"committer bench <bench@example.com> {1600000000 + i} "
+                     f"+0000\n".encode())
+        # Commits to the same branch are chained by fast-import.
+        stream.write(b"data %d\n%s\n\n" % (len(data), data))
+    subprocess.run(["git", "fast-import", "--quiet"], cwd=directory,
+                   input=stream.getvalue(), check=True)
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commits", nargs="+", type=int,
+                        default=[10000, 100000],
+                        help="History lengths to benchmark.")
+    args = parser.parse_args(argv)
+
+    print(f"{'commits':>8} {'seconds':>8} {'commits/sec':>12} "
+          f"{'failing':>8} {'peak (KiB)':>11}")
+    for commits in args.commits:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            make_history(root, commits)
+            (root / "pyproject.toml").write_text("")
+            # Failures are printed as they are found, discard them.
+            out = open(os.devnull, "w")
+            tracemalloc.start()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(out):
+                failing = conventional_pre_commit.check_range(
+                    "main", str(root / "pyproject.toml"), cwd=str(root))
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            out.close()
+        print(f"{commits:>8} {seconds:>8.2f} {commits / seconds:>12.0f} "
+              f"{failing:>8} {peak / 1024:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Benchmark whole-file scans against --diff-only after a one-line change.
+
+Each file of a committed repository gets one added line, then the staged
+content is checked whole and as added lines only. Run from the repository
+root:
+
+    python -m bench.diff_only --files 10 --lines 20000 200000
+"""
+
+import argparse
+import logging
+import os
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from hooks import check_pep672_ascii, check_skip_env
+
+_GIT = ["git", "-c", "user.name=bench", "-c", "user.email=bench@example.com",
+        "-c", "commit.gpgsign=false"]
+GO_LINE = '\tvalue{n} := compute(alpha, beta) // os.Setenv("SKIP_x", "1")\n'
+PY_LINE = "value{n} = compute(alpha, beta)\n"
+
+
+def make_repo(root: Path, files: int, sizes: List[int]) -> List[str]:
+    """Commit Python and Go files of each size in lines, then change them."""
+    subprocess.run(_GIT + ["init", "-q", str(root)], check=True)
+    names = []
+    for lines in sizes:
+        for i in range(files):
+            for suffix, line in ((".py", PY_LINE), ("_test.go", GO_LINE)):
+                name = f"file{lines}_{i}{suffix}"
+                (root / name).write_text("".join(
+                    line.format(n=n) for n in range(lines)))
+                names.append(name)
+    subprocess.run(_GIT + ["add", "."], cwd=root, check=True)
+    subprocess.run(_GIT + ["commit", "-q", "-m", "initial"], cwd=root,
+                   check=True)
+    for name in names:
+        with open(root / name, "a") as f:
+            f.write("changed = True\n")
+    subprocess.run(_GIT + ["add", "."], cwd=root, check=True)
+    return names
+
+
+def timed(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=10,
+                        help="Changed files of each kind.")
+    parser.add_argument("--lines", nargs="+", type=int,
+                        default=[20000, 200000],
+                        help="Lines per file.")
+    args = parser.parse_args(argv)
+    logging.disable(logging.WARNING)
+
+    print(f"{'lines':>8} {'hook':<10} {'whole (s)':>10} {'diff (s)':>9}")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # One repository for all sizes, the staged contents are read by a
+        # git process that stays in the first repository used.
+        names = make_repo(Path(tmp), args.files, args.lines)
+        os.chdir(tmp)
+        try:
+            for lines in args.lines:
+                prefix = f"file{lines}_"
+                py = [Path(n) for n in names
+                      if n.startswith(prefix) and n.endswith(".py")]
+                go = [n for n in names
+                      if n.startswith(prefix) and n.endswith(".go")]
+                cases = {
+                    "PEP-672": lambda diff: check_pep672_ascii.scan_files(
+                        py, False, False, [".py"], from_index=True,
+                        diff_only=diff),
+                    "skip-env": lambda diff: check_skip_env.find_setenv_skips(
+                        go, from_index=True, diff_only=diff),
+                }
+                for hook, run in cases.items():
+                    print(f"{lines:>8} {hook:<10} "
+                          f"{timed(lambda: run(False)):>10.4f} "
+                          f"{timed(lambda: run(True)):>9.4f}")
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
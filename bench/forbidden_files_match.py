@@ -0,0 +1,77 @@
+"""Benchmark forbidden file matching against the previous list lookups.
+
+Matches N staged paths against N protected entries, without git. The
+previous lookup compares Path objects pairwise, so for large sizes it is
+timed on a sample of the protected paths and scaled up. Run from the
+repository root:
+
+    python -m bench.forbidden_files_match --sizes 1000 10000
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import List
+
+from hooks import forbidden_files
+
+# The previous lookup is timed on at most this many protected paths.
+LEGACY_SAMPLE = 500
+
+
+def make_paths(count: int, prefix: str) -> List[str]:
+    """Return ``count`` paths spread over nested directories."""
+    return [f"{prefix}{i % 97}/sub{i % 13}/file{i:06d}.txt"
+            for i in range(count)]
+
+
+def legacy_violations(protected: List[Path],
+                      edited_paths: List[Path]) -> List[Path]:
+    """The pairwise lookup this benchmark is measured against."""
+    return [fpath for fpath in protected if fpath in edited_paths]
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", type=int,
+                        default=[1000, 10000],
+                        help="Numbers of protected and of staged paths.")
+    args = parser.parse_args(argv)
+
+    cwd = Path("/repo")
+    print(f"{'size':>7} {'legacy (s)':>14} {'exact (s)':>10} "
+          f"{'patterns (s)':>13} {'violations':>11}")
+    for size in args.sizes:
+        # Half of the protected paths are staged.
+        staged = make_paths(size, "src")
+        exact = make_paths(size // 2, "src") + make_paths(size // 2, "lib")
+        sample = [cwd / p for p in exact[:LEGACY_SAMPLE]]
+        start = time.perf_counter()
+        edited_paths = [cwd / Path(x) for x in staged]
+        legacy = time.perf_counter() - start
+        start = time.perf_counter()
+        legacy_violations(sample, edited_paths)
+        legacy += (time.perf_counter() - start) * len(exact) / len(sample)
+        estimated = "~" if len(sample) < len(exact) else ""
+
+        start = time.perf_counter()
+        protected = forbidden_files.ProtectedPaths(
+            forbidden_files.normalize(cwd / p, cwd) for p in exact)
+        found = [p for p in staged if protected.match(p)]
+        current = time.perf_counter() - start
+
+        # Directories and globs protecting about as many staged paths.
+        patterns = ([f"src{i}/" for i in range(0, 97, 2)]
+                    + [f"lib{i}/*.txt" for i in range(97)]
+                    + [f"*/sub{i}/*.lock" for i in range(13)])
+        start = time.perf_counter()
+        protected = forbidden_files.ProtectedPaths(patterns)
+        matched = [p for p in staged if protected.match(p)]
+        with_patterns = time.perf_counter() - start
+        print(f"{size:>7} {estimated + format(legacy, '.4f'):>14} "
+              f"{current:>10.4f} {with_patterns:>13.4f} "
+              f"{len(found):>5}/{len(matched)}")
+
+
+if __name__ == "__main__":
+    main()
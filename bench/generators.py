@@ -0,0 +1,135 @@
+"""Synthetic repositories for the benchmarks.
+
+Every generator is deterministic for a given seed, so runs compared against
+a stored baseline scan the same content.
+"""
+
+import random
+import subprocess
+from pathlib import Path
+from typing import List, Tuple
+
+PY_LINE = "value = compute_something(alpha, beta, gamma)  # generated code\n"
+NON_ASCII_LINE = "label = 'caf\u00e9 na\u00efve r\u00e9sum\u00e9'\n"
+GO_HEADER = """package test
+
+import (
+\t"os"
+\t"testing"
+)
+"""
+GO_TEST = """
+func TestCase{n}(t *testing.T) {{
+\t// os.Setenv("SKIP_teardown", "true") stays commented out.
+\tvalue := "{n}"
+\tif value == "" {{
+\t\tt.Fatal("empty")
+\t}}
+}}
+"""
+GO_SETENV = '\tos.Setenv("SKIP_setup_{n}", "true")\n'
+COMMIT_TYPES = ["feat", "fix", "docs", "perf", "refactor", "test"]
+# Identity for the benchmark repositories, whatever the user's config.
+_GIT = ["git", "-c", "user.name=bench", "-c", "user.email=bench@example.com",
+        "-c", "commit.gpgsign=false"]
+
+
+def _spread(root: Path, count: int, dirs: int, suffix: str) -> List[Path]:
+    """Return ``count`` file paths spread over ``dirs`` nested directories."""
+    paths = []
+    for i in range(count):
+        d = i % max(dirs, 1)
+        directory = root / f"pkg{d // 10}" / f"sub{d}"
+        directory.mkdir(parents=True, exist_ok=True)
+        paths.append(directory / f"file{i:06d}{suffix}")
+    return paths
+
+
+def make_source_tree(root: Path, files: int, dirs: int, size: int = 4096,
+                     non_ascii: float = 0.1, seed: int = 0) -> List[Path]:
+    """Write Python files of about ``size`` bytes, a fraction non-ASCII.
+
+    The non-ASCII files hold accented letters, which the PEP-672 check
+    only warns about when suppressed, never BIDI control characters.
+    """
+    rng = random.Random(seed)
+    body = PY_LINE * max(size // len(PY_LINE), 1)
+    paths = _spread(root, files, dirs, ".py")
+    for fpath in paths:
+        if rng.random() < non_ascii:
+            fpath.write_text(body + NON_ASCII_LINE, encoding="utf-8")
+        else:
+            fpath.write_text(body, encoding="utf-8")
+    return paths
+
+
+def make_go_tests(root: Path, files: int, dirs: int, tests: int = 20,
+                  setenv: float = 0.1, seed: int = 0) -> List[Path]:
+    """Write Go test files, a fraction of them calling os.Setenv("SKIP_")."""
+    rng = random.Random(seed)
+    paths = _spread(root, files, dirs, "_test.go")
+    for fpath in paths:
+        parts = [GO_HEADER]
+        for n in range(tests):
+            parts.append(GO_TEST.format(n=n))
+        if rng.random() < setenv:
+            # Insert the call into the body of the last test.
+            parts[-1] = parts[-1].replace(
+                "\tvalue :=", GO_SETENV.format(n=tests) + "\tvalue :=", 1)
+        fpath.write_text("".join(parts))
+    return paths
+
+
+def make_staged_repo(root: Path, files: int, dirs: int, protected: int,
+                     size: int = 1024, seed: int = 0
+                     ) -> Tuple[List[Path], List[Path]]:
+    """Create a git repository with every one of ``files`` files staged.
+
+    Returns the staged files and ``protected`` paths that are not staged,
+    so a forbidden files check passes after comparing all of them.
+    """
+    subprocess.run(_GIT + ["init", "-q", str(root)], check=True)
+    staged = make_source_tree(root, files, dirs, size, 0.0, seed)
+    guarded = _spread(root / "protected", protected, dirs, ".cfg")
+    for fpath in guarded:
+        fpath.write_text("locked = true\n")
+    subprocess.run(_GIT + ["add", "-A"], cwd=root, check=True)
+    subprocess.run(_GIT + ["commit", "-q", "-m", "chore: initial"],
+                   cwd=root, check=True)
+    for fpath in staged:
+        with open(fpath, "a") as f:
+            f.write("changed = True\n")
+    subprocess.run(_GIT + ["add", "-A"], cwd=root, check=True)
+    return staged, guarded
+
+
+def commit_message(rng: random.Random, valid: bool = True) -> str:
+    """Return a commit message, following Conventional Commits if valid."""
+    subject = " ".join(rng.choice(["update", "handle", "remove", "cache",
+                                   "parser", "hooks", "paths", "errors"])
+                       for _ in range(6))
+    body = "\n".join(f"Line {n} of the description." for n in range(5))
+    if not valid:
+        return f"{subject}\n\n{body}\n"
+    return f"{rng.choice(COMMIT_TYPES)}(core): {subject}\n\n{body}\n"
+
+
+def make_commit_messages(root: Path, count: int, invalid: float = 0.1,
+                         seed: int = 0) -> List[Path]:
+    """Write ``count`` project directories each with a .git/COMMIT_EDITMSG.
+
+    Returns the project directories; ``root`` holds the pyproject.toml.
+    """
+    rng = random.Random(seed)
+    (root / "pyproject.toml").write_text(
+        "[tool.conventional_commit_check]\n"
+        f"types = {COMMIT_TYPES!r}\n".replace("'", '"'))
+    projects = []
+    for i in range(count):
+        project = root / f"project{i:06d}"
+        (project / ".git").mkdir(parents=True)
+        message = commit_message(rng, rng.random() >= invalid)
+        (project / ".git" / "COMMIT_EDITMSG").write_text(
+            message + "# Comment lines are ignored.\n")
+        projects.append(project)
+    return projects
@@ -0,0 +1,66 @@
+"""Benchmark the Terraform module index and the root modules it selects.
+
+The repository holds root modules under live/ calling shared modules under
+modules/, which call each other in a chain. The index is built cold, loaded
+again unchanged and after one file changed, then the root modules
+affected by a change to the last shared module are found. Run from the
+repository root:
+
+    python -m bench.module_index --roots 1000 --shared 50
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from hooks import terraform_modules
+
+MODULE = 'module "{name}" {{\n  source = "{source}"\n}}\n'
+
+
+def make_repo(root: Path, roots: int, shared: int) -> None:
+    """Write root modules each calling one of a chain of shared modules."""
+    for i in range(shared):
+        directory = root / "modules" / f"m{i}"
+        directory.mkdir(parents=True)
+        calls = MODULE.format(name="next", source=f"../m{i + 1}")
+        (directory / "main.tf").write_text(calls if i + 1 < shared else "")
+        (directory / "variables.tf").write_text('variable "x" {}\n')
+    for i in range(roots):
+        directory = root / "live" / f"env{i}"
+        directory.mkdir(parents=True)
+        (directory / "main.tf").write_text(MODULE.format(
+            name="shared", source=f"../../modules/m{i % shared}"))
+        (directory / "outputs.tf").write_text('output "x" { value = 1 }\n')
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--roots", type=int, default=1000,
+                        help="Root modules.")
+    parser.add_argument("--shared", type=int, default=50,
+                        help="Shared modules.")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "repo"
+        make_repo(root, args.roots, args.shared)
+        path = Path(tmp) / "index.json"
+        changed = f"modules/m{args.shared - 1}/variables.tf"
+        for case, files in (("cold", []), ("unchanged", []),
+                            ("one changed", [changed])):
+            start = time.perf_counter()
+            index = terraform_modules.load_index(str(root), files, path)
+            print(f"{case:<12} {time.perf_counter() - start:>8.4f}s "
+                  f"{len(index):>7} files")
+        start = time.perf_counter()
+        roots = terraform_modules.affected_roots([changed], index)
+        seconds = time.perf_counter() - start
+        print(f"{len(roots)} root modules affected by {changed} "
+              f"({seconds:.4f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Benchmark the PEP-672 scanner against the previous str-based scanner.
+
+Run from the repository root:
+
+    python -m bench.pep672_scan --sizes 1K 1M 50M
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from hooks import check_pep672_ascii
+
+LINE = b"value = compute_something(alpha, beta, gamma)  # generated code\n"
+
+
+def legacy_scan_file(fpath: Path, suppress: bool) -> None:
+    """The per-character scanner this benchmark is measured against."""
+    with open(fpath) as f:
+        try:
+            utf_str = f.read()
+        except UnicodeDecodeError:
+            return
+    if not utf_str:
+        return
+    bidi_chars = [u"\u2066", u"\u2067", u"\u2068", u"\u202A", u"\u202B",
+                  u"\u202D", u"\u202E"]
+    for bidi_char in bidi_chars:
+        if bidi_char in utf_str:
+            raise UnicodeError(f"{fpath} BIDI control character detected.")
+    for i, char in enumerate(utf_str):
+        if ord(char) > 127:
+            if not suppress:
+                raise UnicodeError(f"{fpath}: char# {i}")
+
+
+def make_file(directory: Path, size: int, tail: bytes) -> Path:
+    """Write an ASCII file of ``size`` bytes whose last line is ``tail``."""
+    fpath = directory / f"generated_{size}.py"
+    body = LINE * (max(size - len(tail), 0) // len(LINE) + 1)
+    fpath.write_bytes(body[:max(size - len(tail), 0)] + tail)
+    return fpath
+
+
+def best_of(func: Callable[[], None], repeat: int) -> float:
+    """Return the fastest wall time of ``repeat`` calls."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            func()
+        except UnicodeError:
+            pass
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+",
+                        default=["1K", "64K", "1M", "10M", "50M"],
+                        help="File sizes to benchmark.")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Runs per measurement, the best is reported.")
+    args = parser.parse_args(argv)
+    logging.disable(logging.WARNING)
+
+    cases = [("ascii", b"x = 1\n"),
+             ("non-ascii at end", "y = '\u00e9'\n".encode("utf-8"))]
+    print(f"{'size':>8} {'input':<18} {'legacy (s)':>12} {'bytes (s)':>12} "
+          f"{'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_text in args.sizes:
+            size = check_pep672_ascii._parse_size(size_text)
+            for name, tail in cases:
+                fpath = make_file(Path(tmp), size, tail)
+                legacy = best_of(lambda: legacy_scan_file(fpath, True),
+                                 args.repeat)
+                current = best_of(
+                    lambda: check_pep672_ascii._scan_file(fpath, True),
+                    args.repeat)
+                print(f"{size_text:>8} {name:<18} {legacy:>12.5f} "
+                      f"{current:>12.5f} {legacy / current:>7.1f}x")
+                fpath.unlink()
+
+
+if __name__ == "__main__":
+    main()
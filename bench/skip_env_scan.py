@@ -0,0 +1,84 @@
+"""Benchmark the Go-aware Setenv scanner against the previous line regex.
+
+The test/fixtures/*_test.go corpus is copied until it reaches the requested
+number of files. Run from the repository root:
+
+    python -m bench.skip_env_scan --files 1000 10000
+"""
+
+import argparse
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from hooks import check_skip_env
+
+FIXTURES = Path(__file__).resolve().parent.parent / "test" / "fixtures"
+
+
+def legacy_has_setenv_skip(fpath: Path) -> bool:
+    """The per-line scanner this benchmark is measured against."""
+    with open(fpath) as f:
+        for line in f:
+            if re.match(r'^\s+os.Setenv\(\"(SKIP_|TERRATEST_REGION)', line):
+                return True
+    return False
+
+
+def current_has_setenv_skip(fpath: Path) -> bool:
+    with open(fpath, "rb") as f:
+        content = f.read().decode("utf-8", "replace")
+    return bool(check_skip_env.find_setenv_calls(content))
+
+
+def make_corpus(directory: Path, count: int) -> List[Path]:
+    """Write ``count`` copies of the Go fixtures into ``directory``."""
+    sources = sorted(FIXTURES.glob("*_test.go"))
+    files = []
+    for i in range(count):
+        source = sources[i % len(sources)]
+        fpath = directory / f"{i:06d}_{source.name}"
+        fpath.write_bytes(source.read_bytes())
+        files.append(fpath)
+    return files
+
+
+def best_of(func: Callable[[], int], repeat: int) -> float:
+    """Return the fastest wall time of ``repeat`` calls."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", nargs="+", type=int,
+                        default=[1000, 5000, 20000],
+                        help="Corpus sizes to benchmark, in files.")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Runs per measurement, the best is reported.")
+    args = parser.parse_args(argv)
+
+    print(f"{'files':>8} {'legacy (s)':>12} {'tokenizer (s)':>14} "
+          f"{'speedup':>8} {'flagged (legacy/tokenizer)':>28}")
+    for count in args.files:
+        with tempfile.TemporaryDirectory() as tmp:
+            files = make_corpus(Path(tmp), count)
+            flagged = [sum(map(scan, files)) for scan in
+                       (legacy_has_setenv_skip, current_has_setenv_skip)]
+            legacy = best_of(
+                lambda: sum(map(legacy_has_setenv_skip, files)), args.repeat)
+            current = best_of(
+                lambda: sum(map(current_has_setenv_skip, files)), args.repeat)
+            print(f"{count:>8} {legacy:>12.4f} {current:>14.4f} "
+                  f"{legacy / current:>7.1f}x "
+                  f"{flagged[0]:>13}/{flagged[1]}")
+
+
+if __name__ == "__main__":
+    main()
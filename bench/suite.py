@@ -0,0 +1,185 @@
+"""Measure the throughput of the Python hooks on synthetic repositories.
+
+Each case generates a repository (see bench/generators.py), then reports the
+best wall time of a few runs as files/sec and MB/sec, and the peak Python
+memory of one more run under tracemalloc. Save the results as a baseline
+and compare later runs against it to catch regressions. Run from the
+repository root:
+
+    python -m bench.suite --files 2000 --save baseline.json
+    python -m bench.suite --files 2000 --compare baseline.json
+"""
+
+import argparse
+import json
+import logging
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from bench import generators
+from hooks import check_pep672_ascii, check_skip_env, forbidden_files
+from hooks import conventional_pre_commit
+
+
+class Workload(NamedTuple):
+    """A prepared benchmark: what to run and how much it processes."""
+    run: Callable[[], None]
+    files: int
+    # Bytes read, 0 when the case does not read file contents.
+    size: int
+
+
+def _total_size(paths: List[Path]) -> int:
+    return sum(p.stat().st_size for p in paths)
+
+
+def pep672(root: Path, args: argparse.Namespace) -> Workload:
+    files = generators.make_source_tree(root, args.files, args.dirs,
+                                        args.size, args.non_ascii)
+    return Workload(lambda: check_pep672_ascii.scan_files(
+        [root], True, True, [".py"]), len(files), _total_size(files))
+
+
+def skip_env(root: Path, args: argparse.Namespace) -> Workload:
+    files = generators.make_go_tests(root, args.files, args.dirs)
+    names = [str(f) for f in files]
+    return Workload(lambda: check_skip_env.find_setenv_skips(names),
+                    len(files), _total_size(files))
+
+
+def forbidden(root: Path, args: argparse.Namespace) -> Workload:
+    staged, guarded = generators.make_staged_repo(
+        root, args.files, args.dirs, args.files, size=256)
+    return Workload(lambda: forbidden_files.protect_files(guarded, root),
+                    len(staged) + len(guarded), 0)
+
+
+def conventional(root: Path, args: argparse.Namespace) -> Workload:
+    projects = generators.make_commit_messages(root, args.files)
+    pyproject = root / "pyproject.toml"
+
+    def run() -> None:
+        for project in projects:
+            try:
+                conventional_pre_commit.cc_check(project, pyproject)
+            except SystemExit:
+                pass
+
+    return Workload(run, len(projects), _total_size(
+        [p / ".git" / "COMMIT_EDITMSG" for p in projects]))
+
+
+CASES = {
+    "pep672": pep672,
+    "skip-env": skip_env,
+    "forbidden-files": forbidden,
+    "conventional-commit": conventional,
+}
+
+
+def measure(workload: Workload, repeat: int) -> Dict[str, float]:
+    """Return the best time, throughput and peak memory of a workload."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        workload.run()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        workload.run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    seconds = max(min(timings), 1e-9)
+    return {"seconds": seconds, "files_per_sec": workload.files / seconds,
+            "mb_per_sec": workload.size / seconds / 1e6,
+            "peak_kib": peak / 1024}
+
+
+def compare(results: Dict[str, Dict[str, float]],
+            baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[str]:
+    """Return the cases slower or hungrier than the baseline by a margin."""
+    regressions = []
+    for case, current in results.items():
+        before = baseline.get(case)
+        if before is None:
+            continue
+        slowest = before["files_per_sec"] * (1 - threshold)
+        if current["files_per_sec"] < slowest:
+            regressions.append(
+                f"{case}: {current['files_per_sec']:.0f} files/sec, "
+                f"baseline {before['files_per_sec']:.0f}")
+        # Allow some slack for the small allocations of the interpreter.
+        if current["peak_kib"] > before["peak_kib"] * (1 + threshold) + 256:
+            regressions.append(
+                f"{case}: peak {current['peak_kib']:.0f} KiB, "
+                f"baseline {before['peak_kib']:.0f} KiB")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES),
+                        default=list(CASES), help="Cases to run.")
+    parser.add_argument("--files", type=int, default=2000,
+                        help="Files (or commit messages) per case.")
+    parser.add_argument("--dirs", type=int, default=100,
+                        help="Directories the files are spread over.")
+    parser.add_argument("--size", type=int, default=4096,
+                        help="Approximate bytes per generated source file.")
+    parser.add_argument("--non-ascii", type=float, default=0.1,
+                        help="Fraction of source files with non-ASCII text.")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Runs per measurement, the best is reported.")
+    parser.add_argument("--save", metavar="PATH",
+                        help="Store the results as a baseline.")
+    parser.add_argument("--compare", metavar="PATH",
+                        help="Fail on regressions against a baseline.")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Tolerated fraction of slowdown or growth.")
+    args = parser.parse_args(argv)
+    logging.disable(logging.WARNING)
+
+    results = {}
+    print(f"{'case':<20} {'files':>7} {'best (s)':>9} {'files/sec':>10} "
+          f"{'MB/sec':>8} {'peak (KiB)':>11}")
+    for case in args.cases:
+        with tempfile.TemporaryDirectory() as tmp:
+            workload = CASES[case](Path(tmp), args)
+            result = measure(workload, args.repeat)
+        results[case] = result
+        rate = f"{result['mb_per_sec']:.1f}" if workload.size else "-"
+        print(f"{case:<20} {workload.files:>7} {result['seconds']:>9.4f} "
+              f"{result['files_per_sec']:>10.0f} {rate:>8} "
+              f"{result['peak_kib']:>11.0f}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"python": platform.python_version(),
+                       "machine": platform.machine(),
+                       "args": {k: getattr(args, k) for k in
+                                ("files", "dirs", "size", "non_ascii")},
+                       "results": results}, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline["args"] != {k: getattr(args, k) for k in baseline["args"]}:
+            print(f"WARNING: {args.compare} was measured with "
+                  f"{baseline['args']}.")
+        regressions = compare(results, baseline["results"], args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"No regression against {args.compare}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
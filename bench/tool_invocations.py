@@ -0,0 +1,78 @@
+"""Benchmark the grouped tool hooks against one tool process per file.
+
+Stub tools that only record their calls stand in for the real ones, so the
+numbers show the cost of process launches. Run from the repository root:
+
+    python -m bench.tool_invocations --files 50 400 --packages 1 10
+"""
+
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from test.tool_stubs import calls, make_stub, stub_env
+
+HOOKS = Path(__file__).resolve().parent.parent / "hooks"
+# The tool started by each hook, and how the shell loop used to call it.
+CASES = {
+    "gofmt": ("go", lambda f: ["go", "fmt", f"./{os.path.dirname(f)}"]),
+    "goimports": ("goimports",
+                  lambda f: ["goimports", "-l", "-w", os.path.dirname(f)]),
+    "golint": ("golint", lambda f: ["golint", "-set_exit_status", f]),
+    "golangci-lint": ("golangci-lint", lambda f: [
+        "golangci-lint", "run", "--new-from-rev", "HEAD", f]),
+}
+
+
+def make_files(directory: Path, files: int, packages: int) -> List[str]:
+    """Spread ``files`` Go files over ``packages`` package directories."""
+    names = []
+    for i in range(files):
+        name = f"pkg{i % packages}/file{i}.go"
+        (directory / name).parent.mkdir(exist_ok=True)
+        (directory / name).write_text("package x\n")
+        names.append(name)
+    return names
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", nargs="+", type=int, default=[50, 400],
+                        help="Numbers of changed files.")
+    parser.add_argument("--packages", nargs="+", type=int, default=[1, 10],
+                        help="Numbers of packages the files are spread over.")
+    args = parser.parse_args(argv)
+
+    print(f"{'hook':<14} {'files':>6} {'packages':>9} {'per file (s)':>13} "
+          f"{'grouped (s)':>12} {'calls':>6}")
+    for hook, (tool, legacy_command) in CASES.items():
+        for count in args.files:
+            for packages in args.packages:
+                with tempfile.TemporaryDirectory() as tmp:
+                    root = Path(tmp)
+                    bin_dir = root / "bin"
+                    make_stub(bin_dir, tool)
+                    files = make_files(root, count, packages)
+                    env = stub_env(bin_dir)
+                    start = time.perf_counter()
+                    for fpath in files:
+                        subprocess.run(legacy_command(fpath), cwd=root,
+                                       env=env, check=True)
+                    legacy = time.perf_counter() - start
+                    (bin_dir / f"{tool}.log").unlink()
+                    start = time.perf_counter()
+                    subprocess.run([str(HOOKS / f"{hook}.sh")] + files,
+                                   cwd=root, env=env, check=True,
+                                   stdout=subprocess.DEVNULL)
+                    grouped = time.perf_counter() - start
+                    print(f"{hook:<14} {count:>6} {packages:>9} "
+                          f"{legacy:>13.3f} {grouped:>12.3f} "
+                          f"{len(calls(bin_dir, tool)):>6}")
+
+
+if __name__ == "__main__":
+    main()
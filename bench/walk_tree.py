@@ -0,0 +1,78 @@
+"""Benchmark finding the files to scan in a large tree.
+
+The tree holds source files next to node_modules, vendor and ignored build
+directories, with a quarter of its entries in each. The previous
+``Path.glob("**/*")`` search is compared with the os.scandir walk used
+outside git and with ``git ls-files`` once the tree is a repository. Run
+from the repository root:
+
+    python -m bench.walk_tree --entries 100000 1000000
+"""
+
+import argparse
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from hooks import walk
+
+EXTENSIONS = [".py", ".sh", ".tf"]
+# Files per leaf directory.
+FANOUT = 100
+
+
+def make_tree(root: Path, entries: int) -> None:
+    """Write about ``entries`` files, half of them with a scanned suffix."""
+    (root / ".gitignore").write_text("build/\n")
+    tops = ["src", "node_modules", "vendor", "build"]
+    for d in range(max(1, entries // FANOUT)):
+        directory = root / tops[d % len(tops)] / f"pkg{d // 100}" / f"d{d}"
+        directory.mkdir(parents=True)
+        for i in range(FANOUT):
+            suffix = EXTENSIONS[i % 3] if i % 2 else ".txt"
+            (directory / f"f{i}{suffix}").touch()
+
+
+def legacy_find(root: Path) -> List[Path]:
+    """The search this benchmark is measured against."""
+    return sorted(x for x in root.glob("**/*")
+                  if x.suffix in EXTENSIONS and x.is_file())
+
+
+def current_find(root: Path) -> List[Path]:
+    return sorted(walk.find_files(root, EXTENSIONS))
+
+
+def timed(func: Callable[[], List[Path]]) -> str:
+    start = time.perf_counter()
+    found = func()
+    return f"{time.perf_counter() - start:>8.2f} {len(found):>8}"
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", nargs="+", type=int,
+                        default=[100000, 1000000],
+                        help="Files in the tree.")
+    args = parser.parse_args(argv)
+
+    print(f"{'entries':>8} {'search':<8} {'seconds':>8} {'files':>8}")
+    for entries in args.entries:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            make_tree(root, entries)
+            print(f"{entries:>8} {'legacy':<8} "
+                  f"{timed(lambda: legacy_find(root))}")
+            print(f"{entries:>8} {'scandir':<8} "
+                  f"{timed(lambda: current_find(root))}")
+            subprocess.run(["git", "init", "-q", str(root)], check=True)
+            # Tracked files come from the index, the rest from a walk.
+            subprocess.run(["git", "add", "src"], cwd=root, check=True)
+            print(f"{entries:>8} {'git':<8} "
+                  f"{timed(lambda: current_find(root))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,66 +2,299 @@
 """Check for PEP-672 (ASCII-only chars in source code) compliance."""
 
 import argparse
+import codecs
 import logging
+import os
+import re
+from contextlib import closing
+from functools import partial
 from pathlib import Path
-from typing import List, Union
+from typing import Iterator, List, Optional, Tuple
+
+try:
+    from . import git_index, instrument, parallel, result_cache, walk
+except ImportError:  # Run as a script from the hooks directory.
+    import git_index
+    import instrument
+    import parallel
+    import result_cache
+    import walk
 
 logger = logging.getLogger(__name__)
 
+# Positions of BIDI characters and of non-ASCII runs as (line, column) pairs.
+Findings = Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]
+
+BIDI_CHARS = [u"\u2066", u"\u2067", u"\u2068", u"\u202A", u"\u202B",
+              u"\u202D", u"\u202E"]
+DEFAULT_MAX_MEMORY = 64 * 1024 * 1024
+# Bump whenever a change alters the findings for the same file content.
+CACHE_VERSION = 1
+
+# Files are scanned as raw bytes: every non-ASCII code point is encoded as
+# bytes >= 0x80 in UTF-8 and each BIDI character has a fixed 3-byte encoding,
+# so neither search needs the file decoded to str first.
+_BIDI_RE = re.compile(b"|".join(re.escape(c.encode("utf-8"))
+                                for c in BIDI_CHARS))
+_BIDI_OVERLAP = 2
+_NON_ASCII_RE = re.compile(rb"[\x80-\xff]+")
+_CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+_UTF8_DECODER = codecs.getincrementaldecoder("utf-8")
+_BLOCK_SIZE = 64 * 1024
+_SIZE_UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
 
 def scan_files(plist: List[Path], recursive: bool, suppress: bool,
-               extensions: List[str]) -> None:
-    """Check files for PEP-672 compliance."""
+               extensions: List[str],
+               max_memory: int = DEFAULT_MAX_MEMORY, jobs: int = 1,
+               cache: Optional[result_cache.ResultCache] = None,
+               from_index: bool = False, diff_only: bool = False) -> None:
+    """Check files for PEP-672 compliance.
+
+    Every file is scanned before failing, and a single UnicodeError lists
+    all violations in the order the files were given. Files whose content
+    already has a verdict in ``cache`` are not scanned again. With
+    ``from_index`` the staged content of files is checked instead of the
+    working tree copy, for every file that is in the git index. With
+    ``diff_only`` only the lines added by the staged changes are checked,
+    so violations already committed are not reported, and whole files are
+    checked if the staged changes cannot be read. Directories are
+    searched with walk.find_files, which skips ignored files and
+    directories such as .git and node_modules.
+    """
     flist = []
     for pth in plist:
         if pth.is_file():
             if pth.suffix in extensions:
                 flist.append(pth)
         elif pth.is_dir():
-            glob_str = "**/*" if recursive else "*"
-            new_files = [x for x in pth.glob(glob_str)
-                         if x.suffix in extensions]
-            flist.extend(new_files)
+            flist.extend(sorted(walk.find_files(pth, extensions, recursive)))
         else:
             logger.error(f"Path {pth} is not valid, skipping.")
-    for fname in flist:
-        _scan_file(fname, suppress)
+    hunks = git_index.staged_hunks(flist) if diff_only else None
+    if diff_only and hunks is None:
+        logger.warning("Could not read the staged changes, checking whole "
+                       "files.")
+    if hunks is not None:
+        findings = [_scan_hunks(hunks.get(str(fpath), []), suppress)
+                    for fpath in flist]
+    else:
+        findings = _scan_targets(flist, suppress, max_memory, jobs, cache,
+                                 from_index)
+    errors = []
+    for fpath, found in zip(flist, findings):
+        file_errors, file_warnings = _messages(fpath, found, suppress)
+        for msg in file_warnings:
+            logger.warning(msg)
+        errors.extend(file_errors)
     logger.info(f"Scanned {len(flist)} files.")
+    if errors:
+        raise UnicodeError("\n".join(errors))
+
+
+def _scan_targets(flist: List[Path], suppress: bool, max_memory: int,
+                  jobs: int, cache: Optional[result_cache.ResultCache],
+                  from_index: bool) -> List[Findings]:
+    blobs = git_index.staged_blobs(flist) if from_index else {}
+    blob_ids = [blobs.get(str(fpath)) for fpath in flist]
+    findings: List[Optional[Findings]] = [None] * len(flist)
+    content_ids = []
+    if cache is not None:
+        content_ids = [blob or result_cache.blob_sha(fpath)
+                       for fpath, blob in zip(flist, blob_ids)]
+        findings = [cache.get(content_id) for content_id in content_ids]
+    todo = [i for i, found in enumerate(findings) if found is None]
+    scan = partial(_scan_target, suppress=suppress, max_memory=max_memory)
+    results = parallel.map_batched(
+        scan, [(flist[i], blob_ids[i]) for i in todo], jobs)
+    for i, found in zip(todo, results):
+        findings[i] = found
+        if cache is not None:
+            cache.put(content_ids[i], found)
+    return findings
+
+
+def _scan_hunks(hunks: List[git_index.Hunk], suppress: bool) -> Findings:
+    """Return the positions of BIDI and non-ASCII characters in hunks."""
+    bidi: List[Tuple[int, int]] = []
+    non_ascii: List[Tuple[int, int]] = []
+    for start, content in hunks:
+        if content.isascii():
+            continue
+        scanner = _Scanner(line=start)
+        scanner.feed(content, final=True)
+        if scanner.valid:
+            bidi.extend(scanner.bidi)
+            non_ascii.extend(scanner.non_ascii)
+    if not suppress:
+        # As for whole files, only the first of each kind is reported.
+        return bidi[:1], non_ascii[:1]
+    return bidi, non_ascii
+
+
+def _scan_target(target: Tuple[Path, Optional[str]], suppress: bool,
+                 max_memory: int) -> Findings:
+    fpath, blob = target
+    with instrument.timed("file", str(fpath)) as fields:
+        if instrument.enabled():
+            fields["bytes"] = fpath.stat().st_size
+        return _scan_file(fpath, suppress, max_memory, blob)
+
+
+def _scan_file(fpath: Path, suppress: bool,
+               max_memory: int = DEFAULT_MAX_MEMORY,
+               blob: Optional[str] = None) -> Findings:
+    """Return the positions of BIDI and non-ASCII characters in a file.
+
+    If the SHA of a staged blob is given, its content is read from the git
+    index rather than from the working tree.
+    """
+    scanner = _Scanner(limit=None if suppress else 1)
+    # Joining a chunk with the bytes carried over from the previous one
+    # briefly holds two copies, so each chunk gets half of the budget.
+    chunk_size = max(max_memory // 2, _BLOCK_SIZE)
+    if blob is None:
+        chunks = _read_chunks(fpath, chunk_size)
+    else:
+        chunks = git_index.shared_reader().stream(blob, chunk_size)
+    with closing(chunks):
+        chunk = next(chunks, b"")
+        if len(chunk) < chunk_size and chunk.isascii():
+            # The whole file fit in one read and there is nothing to locate.
+            return [], []
+        scanner.feed(chunk)
+        for chunk in chunks:
+            scanner.feed(chunk)
+            if not scanner.valid:
+                break
+    scanner.feed(b"", final=True)
+    if not scanner.valid:
+        # Not a UTF-8 text file, nothing to check.
+        return [], []
+    return scanner.bidi, scanner.non_ascii
+
 
+def _read_chunks(fpath: Path, chunk_size: int) -> Iterator[bytes]:
+    with open(fpath, "rb") as f:
+        # A read allocates its whole size up front, so none asks for more
+        # than what is left of the file, or a block if the file grew.
+        remaining = os.fstat(f.fileno()).st_size
+        while True:
+            chunk = f.read(min(chunk_size, max(remaining, _BLOCK_SIZE)))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+            yield chunk
 
-def _scan_file(fpath: Path, suppress: bool) -> None:
-    utf_str = _get_unicode_str(fpath)
-    if not utf_str:
-        return
-    bidi_chars = [u"\u2066", u"\u2067", u"\u2068", u"\u202A", u"\u202B",
-                  u"\u202D", u"\u202E"]
-    for bidi_char in bidi_chars:
-        if bidi_char in utf_str:
-            raise UnicodeError(f"""{fpath}
-BIDI control character detected. Possible malicious code execution.""")
-    for i, char in enumerate(utf_str):
-        code_point = ord(char)
-        if code_point > 127:
-            msg = f"""{fpath}: char# {i}
+
+def _messages(fpath: Path, findings: Findings,
+              suppress: bool) -> Tuple[List[str], List[str]]:
+    """Format the findings of a file as error and warning messages."""
+    bidi, non_ascii = findings
+    if bidi:
+        line, column = bidi[0]
+        return [f"""{fpath}: line {line}, column {column}
+BIDI control character detected. Possible malicious code execution."""], []
+    messages = [f"""{fpath}: line {line}, column {column}
 Non-ASCII character detected.
 If the file is a source code file, please check for possible homoglyphs.
-"""
-            if suppress:
-                logger.warn(msg)
-            else:
-                raise UnicodeError(msg)
+""" for line, column in non_ascii]
+    if suppress:
+        return [], messages
+    return messages, []
+
+
+class _Scanner:
+    """Find BIDI characters and non-ASCII runs in a stream of byte chunks.
+
+    Chunks may split multi-byte UTF-8 sequences anywhere: the decoder used
+    for validation keeps incomplete sequences between calls, and the last
+    bytes of every chunk are held back so that a BIDI character straddling
+    two chunks is still matched. Positions are recorded as 1-based
+    (line, column) pairs, counting lines from ``line``, at most ``limit``
+    of each kind.
+    """
 
+    def __init__(self, limit: Optional[int] = None, line: int = 1) -> None:
+        self.bidi: List[Tuple[int, int]] = []
+        self.non_ascii: List[Tuple[int, int]] = []
+        self.valid = True
+        self._limit = limit
+        self._decoder = _UTF8_DECODER()
+        self._carry = b""
+        self._line = line
+        self._column = 0
+        self._in_run = False
 
-def _get_unicode_str(fpath: Path) -> Union[str, None]:
-    with open(fpath) as f:
+    def feed(self, chunk: bytes, final: bool = False) -> None:
+        """Scan the next chunk, ``final`` marks the end of the stream."""
+        if not self.valid:
+            return
+        buf = self._carry + chunk
+        end = len(buf) if final else max(len(buf) - _BIDI_OVERLAP, 0)
+        self._carry = buf[end:]
+        for start in range(0, end, _BLOCK_SIZE):
+            self._scan_block(buf, start, min(start + _BLOCK_SIZE, end))
+        if final and self.valid:
+            try:
+                self._decoder.decode(b"", final=True)
+            except UnicodeDecodeError:
+                self.valid = False
+
+    def _scan_block(self, buf: bytes, start: int, end: int) -> None:
+        if not self.valid:
+            return
+        block = buf[start:end]
+        # Pure ASCII blocks are skipped with bytes.isascii, which is much
+        # faster than any regex, unless they must complete a multi-byte
+        # sequence left pending by the previous block.
+        if block.isascii() and not self._decoder.getstate()[0]:
+            self._line, self._column = _advance(self._line, self._column,
+                                                block)
+            self._in_run = False
+            return
         try:
-            f_str = f.read()
-            return f_str
+            self._decoder.decode(block)
         except UnicodeDecodeError:
-            pass
+            self.valid = False
+            return
+        hits = [(m.start() - start, True)
+                for m in _BIDI_RE.finditer(buf, start, end + _BIDI_OVERLAP)
+                if m.start() < end]
+        hits.extend((m.start(), False) for m in _NON_ASCII_RE.finditer(block)
+                    # Skip the tail of a run that began in the previous block.
+                    if m.start() > 0 or not self._in_run)
+        line, column, pos = self._line, self._column, 0
+        for offset, is_bidi in sorted(hits):
+            line, column = _advance(line, column, block[pos:offset])
+            pos = offset
+            found = self.bidi if is_bidi else self.non_ascii
+            if self._limit is None or len(found) < self._limit:
+                found.append((line, column + 1))
+        self._line, self._column = _advance(line, column, block[pos:])
+        self._in_run = block[-1] > 127
 
 
-if __name__ == "__main__":
+def _advance(line: int, column: int, segment: bytes) -> Tuple[int, int]:
+    """Move a (line, column) position past a segment of UTF-8 bytes."""
+    newlines = segment.count(b"\n")
+    if newlines:
+        line += newlines
+        segment = segment[segment.rfind(b"\n") + 1:]
+        column = 0
+    # Every code point has exactly one byte that is not a continuation byte.
+    return line, column + len(segment.translate(None, _CONTINUATION_BYTES))
+
+
+def _parse_size(text: str) -> int:
+    """Parse a size such as ``512``, ``64K`` or ``1G`` into bytes."""
+    unit = text[-1:].upper()
+    if unit in _SIZE_UNITS:
+        return int(text[:-1]) * _SIZE_UNITS[unit]
+    return int(text)
+
+
+def main() -> None:
     logging.basicConfig(level=logging.INFO)
     parser = argparse.ArgumentParser(description="Check code for PEP-672.")
     parser.add_argument("-s", "--suppress", action="store_true",
@@ -71,8 +304,40 @@ if __name__ == "__main__":
     parser.add_argument("-e", "--extension", type=str, nargs="+",
                         default=[".c", ".cc", ".cpp", ".py"],
                         help="Specify extensions to scan.")
+    parser.add_argument("-m", "--max-memory", type=_parse_size,
+                        default=DEFAULT_MAX_MEMORY,
+                        help="Memory used to buffer each file, e.g. 16M. "
+                             "Larger files are scanned in chunks.")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Number of processes scanning files, "
+                             "0 for one per CPU.")
+    parser.add_argument("--worktree", action="store_true",
+                        help="Scan working tree files even if they are "
+                             "staged, instead of their staged content.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Scan every file, ignoring cached results.")
+    parser.add_argument("--diff-only", action="store_true",
+                        help="Only check the lines added by the staged "
+                             "changes, from a single git diff.")
     parser.add_argument("targets", type=str, nargs="+",
                         help="Full path to files or directories to scan.")
     args = parser.parse_args()
-    scan_files([Path(x) for x in args.targets], args.recursive, args.suppress,
-               args.extension)
+    cache = None
+    # Added lines are cheap to check and are not worth caching.
+    if not args.no_cache and not args.diff_only:
+        cache = result_cache.ResultCache("PEP-672", CACHE_VERSION,
+                                         {"suppress": args.suppress})
+    with instrument.hook_run("PEP-672") as stats:
+        try:
+            scan_files([Path(x) for x in args.targets], args.recursive,
+                       args.suppress, args.extension, args.max_memory,
+                       args.jobs, cache, not args.worktree, args.diff_only)
+        finally:
+            if cache is not None:
+                cache.close()
+                logger.info(cache.summary())
+                stats.update(cache_hits=cache.hits, cache_misses=cache.misses)
+
+
+if __name__ == "__main__":
+    main()
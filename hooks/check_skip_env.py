@@ -1,19 +1,155 @@
 #!/usr/bin/env python
+import os
 import re
 import sys
 import argparse
 import logging
+from functools import lru_cache, partial
+from pathlib import Path
 
+import toml
 
-logging.basicConfig(format='%(asctime)s [%(levelname)s] %(message)s', level=logging.INFO)
+try:
+    from . import git_index, instrument, parallel, result_cache
+except ImportError:  # Run as a script from the hooks directory.
+    import git_index
+    import instrument
+    import parallel
+    import result_cache
 
 
-def has_setenv_skip(fpath):
+DEFAULT_FORBIDDEN_KEYS = ['SKIP_', 'TERRATEST_REGION']
+# Bump whenever a change alters the verdict for the same file content.
+CACHE_VERSION = 3
+# A character that would make os part of a longer selector, e.g. myos.Setenv.
+_IDENTIFIER_CHAR = re.compile(r'[\w.]')
+
+
+@lru_cache(maxsize=None)
+def compile_rules(keys):
+    """Compile forbidden Setenv key prefixes into a single Go-aware regex.
+
+    The regex is a small tokenizer: comments, interpreted and raw strings and
+    rune literals are matched whole so that any os.Setenv call inside them is
+    skipped, and only calls in live code produce a match with a key.
+    """
+    alternatives = '|'.join(re.escape(key) for key in keys)
+    return re.compile(
+        r'//[^\n]*'
+        # An unterminated block comment runs to the end of the file.
+        r'|/\*[^*]*(?:\*+[^*/][^*]*)*(?:\*+/|\*+\Z|\Z)'
+        r'|"(?:[^"\\\n]|\\.)*"'
+        r'|`[^`]*`'
+        r"|'(?:[^'\\\n]|\\.)*'"
+        # No \b before os: every alternative starting with a literal lets the
+        # regex engine jump straight to candidate positions.
+        r'|os\.Setenv\(\s*"(?P<key>(?:{})(?:[^"\\\n]|\\.)*)"?'.format(alternatives)
+    )
+
+
+def find_setenv_calls(content, keys=tuple(DEFAULT_FORBIDDEN_KEYS)):
+    """Return (line number, key) for every live forbidden os.Setenv call.
+
+    The file is tokenized in a single linear pass, so calls in line or block
+    comments and in string literals are ignored wherever they appear.
+    """
+    if not keys:
+        return []
+    hits = []
+    line = 1
+    pos = 0
+    for match in compile_rules(tuple(keys)).finditer(content):
+        if match.group('key') is None:
+            continue
+        if match.start() and _IDENTIFIER_CHAR.match(content, match.start() - 1):
+            continue
+        line += content.count('\n', pos, match.start())
+        pos = match.start()
+        hits.append((line, match.group('key')))
+    return hits
+
+
+def find_added_setenv_calls(hunks, keys=tuple(DEFAULT_FORBIDDEN_KEYS)):
+    """Return (line number, key) for the forbidden calls in added lines.
+
+    Each hunk is tokenized on its own: a call added inside a block comment
+    opened by an unchanged line is reported, as the comment is not seen.
+    """
+    hits = []
+    for start, content in hunks:
+        hits.extend((start + line - 1, key) for line, key in find_setenv_calls(content.decode('utf-8', 'replace'), keys))
+    return hits
+
+
+def has_setenv_skip(fpath, keys=tuple(DEFAULT_FORBIDDEN_KEYS)):
     with open(fpath) as f:
-        for line in f:
-            if re.match(r'^\s+os.Setenv\(\"(SKIP_|TERRATEST_REGION)', line):
-                return True
-    return False
+        return bool(find_setenv_calls(f.read(), keys))
+
+
+def load_forbidden_keys(pyproject_file):
+    """Read the forbidden Setenv key prefixes from pyproject.toml.
+
+    Raises ValueError if they are not a list of non-empty strings.
+    """
+    try:
+        toml_dict = toml.load(pyproject_file)
+    except FileNotFoundError:
+        return list(DEFAULT_FORBIDDEN_KEYS)
+    except toml.TomlDecodeError as e:
+        raise ValueError('{}: {}'.format(pyproject_file, e))
+    try:
+        keys = toml_dict['tool']['check_skip_env']['forbidden_keys']
+    except KeyError:
+        keys = None
+    if keys is None:
+        return list(DEFAULT_FORBIDDEN_KEYS)
+    if not isinstance(keys, list) or not all(isinstance(key, str) and key for key in keys):
+        raise ValueError('{}: tool.check_skip_env.forbidden_keys must be a list of non-empty strings, '
+                         'e.g. ["SKIP_", "TERRATEST_REGION"], got {!r}.'.format(pyproject_file, keys))
+    return keys
+
+
+def find_setenv_skips(files, keys=tuple(DEFAULT_FORBIDDEN_KEYS), cache=None, from_index=False, jobs=1, diff_only=False):
+    """Return (file, hits) for every file with forbidden Setenv calls.
+
+    Verdicts are reused from the cache when possible, and the remaining files
+    are scanned over a process pool. With from_index, staged files are checked
+    as they are in the git index. With diff_only, only the lines added by the
+    staged changes are checked, or whole files if the diff cannot be read.
+    """
+    keys = tuple(keys)
+    hunks = git_index.staged_hunks(files) if diff_only else None
+    if diff_only and hunks is None:
+        logging.warning('Could not read the staged changes, checking whole files.')
+    if hunks is not None:
+        found = [(fpath, find_added_setenv_calls(hunks.get(fpath, []), keys)) for fpath in files]
+        return [(fpath, hits) for fpath, hits in found if hits]
+    blobs = git_index.staged_blobs(files) if from_index else {}
+    targets = [(fpath, blobs.get(fpath)) for fpath in files]
+    verdicts = [None] * len(files)
+    content_ids = []
+    if cache is not None:
+        content_ids = [blob or result_cache.blob_sha(Path(fpath)) for fpath, blob in targets]
+        verdicts = [cache.get(content_id) for content_id in content_ids]
+    todo = [i for i, verdict in enumerate(verdicts) if verdict is None]
+    check = partial(_check_target, keys=keys)
+    for i, hits in zip(todo, parallel.map_batched(check, [targets[i] for i in todo], jobs)):
+        verdicts[i] = hits
+        if cache is not None:
+            cache.put(content_ids[i], hits)
+    return [(fpath, hits) for fpath, hits in zip(files, verdicts) if hits]
+
+
+def _check_target(target, keys):
+    fpath, blob = target
+    with instrument.timed('file', fpath) as fields:
+        if blob is None:
+            with open(fpath, 'rb') as f:
+                content = f.read()
+        else:
+            content = git_index.shared_reader().read(blob)
+        fields['bytes'] = len(content)
+        return find_setenv_calls(content.decode('utf-8', 'replace'), keys)
 
 
 def parse_args():
@@ -30,17 +166,67 @@ def parse_args():
         nargs='+',
         help='The file to check.',
     )
+    parser.add_argument(
+        '--toml',
+        dest='toml',
+        metavar='PYPROJECT_TOML',
+        type=str,
+        default=os.path.join(os.getcwd(), 'pyproject.toml'),
+        help=(
+            'The path to the `pyproject.toml` file listing the forbidden key prefixes in '
+            '[tool.check_skip_env] forbidden_keys. Defaults to `pyproject.toml` in the current working directory.'
+        ),
+    )
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        default=1,
+        help='Number of processes checking files, 0 for one per CPU.',
+    )
+    parser.add_argument(
+        '--worktree',
+        action='store_true',
+        help='Check working tree files even if they are staged, instead of their staged content.',
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Check every file, ignoring cached results.',
+    )
+    parser.add_argument(
+        '--diff-only',
+        action='store_true',
+        help='Only check the lines added by the staged changes, from a single git diff.',
+    )
     args = parser.parse_args()
     return args
 
 
 def main():
+    logging.basicConfig(format='%(asctime)s [%(levelname)s] %(message)s', level=logging.INFO)
     args = parse_args()
-    files_with_setenv_skip = [fpath for fpath in args.files if has_setenv_skip(fpath)]
+    try:
+        keys = load_forbidden_keys(args.toml)
+    except ValueError as e:
+        logging.error(e)
+        sys.exit(1)
+    cache = None
+    if not args.no_cache and not args.diff_only:
+        cache = result_cache.ResultCache('check-terratest-skip-env', CACHE_VERSION, {'keys': sorted(keys)})
+    with instrument.hook_run('check-terratest-skip-env') as stats:
+        try:
+            files_with_setenv_skip = find_setenv_skips(args.files, keys, cache, not args.worktree, args.jobs, args.diff_only)
+        finally:
+            if cache is not None:
+                cache.close()
+                logging.info(cache.summary())
+                stats.update(cache_hits=cache.hits, cache_misses=cache.misses)
     if files_with_setenv_skip:
         logging.error('Found files with os.Setenv calls setting terratest SKIP environment variables.')
-        for f in files_with_setenv_skip:
-            logging.error('- {}'.format(f))
+        for f, hits in files_with_setenv_skip:
+            for line, key in hits:
+                logging.error('- {}:{}: os.Setenv("{}")'.format(f, line, key))
         sys.exit(1)
 
 
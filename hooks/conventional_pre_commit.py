@@ -2,27 +2,32 @@
 """Python script to check for conventional commit style."""
 
 import os
+import re
+import subprocess
 from pathlib import Path
 import argparse
 import toml
 import sys
+from typing import Iterator, List, Optional, Tuple
+
+try:
+    from . import instrument
+except ImportError:  # Run as a script from the hooks directory.
+    import instrument
 
 DEFAULT_CC_TYPES = ["build", "chore", "ci", "docs", "feat", "fix", "perf", "refactor", "revert", "style", "test"]
 DEFAULT_CC_SCOPES = []
 VALID_COMMIT_START_CHARS = [":", "!:"]
+BREAKING_CHANGE = "BREAKING CHANGE:"
+# Messages are read from git log in blocks of this many bytes.
+_READ_SIZE = 1 << 16
 
+# type(scope) followed by an optional "!" and the first ":" of the rest.
+_CC_PATTERN = re.compile(r"(?P<type>[^(]*)\((?P<scope>[^)]*)\)(?P<rest>.*)", re.DOTALL)
 
-def cc_check(project_dir: str, pyproject_file: str) -> None:
-    """Retrieve the git commit message and check it for CC style.
-
-    CC stands for conventional commits [https://conventionalcommits.org]
-    Not using regex.
 
-    Args:
-        project_dir (str): The root directory of the project.
-        pyproject_file (str): The path to the `pyproject.toml`
-    """
-    # Retrieve conventional commit configuration from pyproject.toml
+def load_config(pyproject_file: str) -> Tuple[List[str], List[str]]:
+    """Return the allowed types and scopes configured in pyproject.toml."""
     toml_dict = toml.load(open(pyproject_file))
 
     # Need to retrieve types list from pyproject.toml.
@@ -35,27 +40,20 @@ def cc_check(project_dir: str, pyproject_file: str) -> None:
         cc_scopes = toml_dict["tool"]["conventional_commit_check"]["scopes"] if toml_dict["tool"]["conventional_commit_check"]["scopes"] is not None else DEFAULT_CC_TYPES
     except KeyError:
         cc_scopes = DEFAULT_CC_SCOPES
+    return cc_types, cc_scopes
 
-    # Retrieve commit message.
-    msg_file = project_dir / ".git" / "COMMIT_EDITMSG"
-    commit_msg_lines = open(msg_file).readlines()
 
-    # Parse the commit message to remove any ignored lines.
-    commit_msg = []
-    for line in commit_msg_lines:
-        if line[0] == "#":
-            continue
-        commit_msg.append(line)
-
-    commit_msg = '\n'.join(commit_msg).strip()
-
-    error_msg = f"""Commit message:
-{commit_msg}
+class CommitValidator:
+    """Check commit messages against the configured types and scopes.
 
-does not follow Conventional Commits formatting.
-https://www.conventionalcommits.org/
+    The types, scopes and help text are prepared once, so validating each
+    further message costs one regex match and a few lookups.
+    """
 
-Conventional Commits start with one of the below types:
+    def __init__(self, cc_types: List[str], cc_scopes: List[str]) -> None:
+        self.types = frozenset(cc_types)
+        self.scopes = frozenset(cc_scopes)
+        self.help = f"""Conventional Commits start with one of the below types:
 {','.join(cc_types)}
 
 followed by the scope in parentheses which is one of:
@@ -77,56 +75,119 @@ Example:
 
     BREAKING CHANGE: removes support for tensorflow 2
 """
-    # Validate that the commit message is not just an empty string
-    if not commit_msg:
-        sys.exit(error_msg)
 
-    # Validate the type in the commit message.
-    cc_type_start_index = 0
-    try:
-        cc_type_end_index = commit_msg.index("(")
-        cc_type = commit_msg[cc_type_start_index:cc_type_end_index]
-        if cc_type not in cc_types:
-            sys.exit(error_msg)
-    except ValueError:
-        sys.exit(error_msg)
-
-    # Validate the scope in the commit message.
-    try:
-        cc_scope_start_index = cc_type_end_index + 1
-        cc_scope_end_index = commit_msg.index(")")
-        cc_scope = commit_msg[cc_scope_start_index:cc_scope_end_index]
-        if cc_scopes and cc_scope not in cc_scopes:
-            sys.exit(error_msg)
-    except ValueError:
-        sys.exit(error_msg)
-    commit_msg = commit_msg[cc_scope_end_index + 1:]
-
-    # Validate that the commit message begins with either a ":" or "!:" (for breaking changes).
-    breaking_change = commit_msg[0] == "!"
+    def check(self, commit_msg: str) -> Optional[str]:
+        """Return why a stripped commit message is invalid, or None."""
+        if not commit_msg:
+            return "empty message"
+        match = _CC_PATTERN.match(commit_msg)
+        if match is None:
+            return "missing type(scope)"
+        if match.group("type") not in self.types:
+            return f"unknown type '{match.group('type')}'"
+        if self.scopes and match.group("scope") not in self.scopes:
+            return f"unknown scope '{match.group('scope')}'"
+        rest = match.group("rest")
+        breaking_change = rest[:1] == "!"
+        colon_index = rest.find(":")
+        if colon_index < 0:
+            return "missing ':' after the scope"
+        description = rest[colon_index + 1:]
+        if not description:
+            return "empty description"
+        index = description.find(BREAKING_CHANGE)
+        if breaking_change:
+            if index < 0:
+                return f"'!' without a {BREAKING_CHANGE} footer"
+            if not description[index + len(BREAKING_CHANGE) + 1:]:
+                return f"empty {BREAKING_CHANGE} description"
+        elif index >= 0:
+            return f"{BREAKING_CHANGE} footer without '!'"
+        return None
+
+
+def cc_check(project_dir: str, pyproject_file: str) -> None:
+    """Retrieve the git commit message and check it for CC style.
+
+    CC stands for conventional commits [https://conventionalcommits.org]
+
+    Args:
+        project_dir (str): The root directory of the project.
+        pyproject_file (str): The path to the `pyproject.toml`
+    """
+    # Retrieve conventional commit configuration from pyproject.toml
+    validator = CommitValidator(*load_config(pyproject_file))
+
+    # Retrieve commit message.
+    msg_file = project_dir / ".git" / "COMMIT_EDITMSG"
+    commit_msg_lines = open(msg_file).readlines()
+
+    # Parse the commit message to remove any ignored lines.
+    commit_msg = []
+    for line in commit_msg_lines:
+        if line[0] == "#":
+            continue
+        commit_msg.append(line)
+
+    commit_msg = '\n'.join(commit_msg).strip()
+
+    if validator.check(commit_msg) is not None:
+        sys.exit(f"""Commit message:
+{commit_msg}
+
+does not follow Conventional Commits formatting.
+https://www.conventionalcommits.org/
+
+{validator.help}""")
+
+
+def iter_commits(rev_range: str, cwd: Optional[str] = None) -> Iterator[Tuple[str, str]]:
+    """Yield (hash, message) for the commits of a range, newest first.
+
+    Messages are streamed from a single git log process, so memory does not
+    grow with the length of the history.
+    """
+    proc = subprocess.Popen(["git", "log", "--format=%H%x00%B%x00", rev_range, "--"],
+                            stdout=subprocess.PIPE, cwd=cwd)
+    sha = None
+    pending = b""
     try:
-        colon_index = commit_msg.index(":")
-    except ValueError:
-        sys.exit(error_msg)
-    commit_msg = commit_msg[colon_index + 1:]
-
-    # Validate that the commit message actually exists
-    if not commit_msg:
-        sys.exit(error_msg)
-
-    # Validate that the breaking change description exists in the commit, if this is a breaking change.
-    if breaking_change:
-        if "BREAKING CHANGE:" not in commit_msg:
-            sys.exit(error_msg)
-        breaking_change_start_index = commit_msg.index("BREAKING CHANGE:")
-        breaking_change_end_index = breaking_change_start_index + len("BREAKING CHANGE:")
-        breaking_change_msg = commit_msg[breaking_change_end_index + 1:]
-
-        # Validate that the description of the breaking change is non-zero length.
-        if breaking_change and not breaking_change_msg:
-            sys.exit(error_msg)
-    if not breaking_change and "BREAKING CHANGE:" in commit_msg:
-        sys.exit(error_msg)
+        for block in iter(lambda: proc.stdout.read(_READ_SIZE), b""):
+            *fields, pending = (pending + block).split(b"\0")
+            for field in fields:
+                if sha is None:
+                    # Every record but the first starts with a newline.
+                    sha = field.strip().decode("ascii")
+                else:
+                    yield sha, field.decode("utf-8", "replace")
+                    sha = None
+    finally:
+        proc.stdout.close()
+        returncode = proc.wait()
+    if returncode:
+        raise ValueError(f"git log {rev_range} failed with exit status {returncode}.")
+
+
+def check_range(rev_range: str, pyproject_file: str, cwd: Optional[str] = None) -> int:
+    """Check every commit message of a range, printing each failing commit.
+
+    Returns the number of failing commits.
+    """
+    validator = CommitValidator(*load_config(pyproject_file))
+    failures = count = 0
+    for count, (sha, message) in enumerate(iter_commits(rev_range, cwd), 1):
+        reason = validator.check(message.strip())
+        if reason is not None:
+            failures += 1
+            subject = message.strip().split("\n", 1)[0]
+            print(f"{sha[:12]} {subject}: {reason}")
+    if failures:
+        print(f"""
+{failures} of {count} commit messages in {rev_range} do not follow Conventional Commits formatting.
+https://www.conventionalcommits.org/
+
+{validator.help}""")
+    return failures
 
 
 def parse_args():
@@ -154,6 +215,12 @@ def parse_args():
         default=os.path.join(os.getcwd(), "pyproject.toml"),
         help='The path to the `pyproject.toml` file. Defaults to `pyproject.toml` in the current working directory.',
     )
+    parser.add_argument(
+        '--range',
+        dest='range',
+        metavar='A..B',
+        help='Check the messages of every commit in a git revision range, e.g. origin/main..HEAD, instead of the commit being made.',
+    )
     args = parser.parse_args()
     return args
 
@@ -162,10 +229,15 @@ def main():
     args = parse_args()
     project_dir = Path(args.project_dir)
     pyproject_file = Path(args.toml)
-    try:
-        cc_check(project_dir=project_dir, pyproject_file=pyproject_file)
-    except ValueError as e:
-        sys.exit(str(e))
+    with instrument.hook_run('conventional-pre-commit'):
+        try:
+            if args.range:
+                if check_range(args.range, pyproject_file, cwd=project_dir):
+                    sys.exit(1)
+            else:
+                cc_check(project_dir=project_dir, pyproject_file=pyproject_file)
+        except ValueError as e:
+            sys.exit(str(e))
 
 
 if __name__ == '__main__':
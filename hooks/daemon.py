@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""Run the Python hooks, optionally through a long-lived local server.
+
+Every hook run normally starts a new interpreter that imports the hook and
+its dependencies again. With PRECOMMIT_DAEMON=1 this thin client instead
+forwards its arguments, working directory and environment to a server
+listening on a Unix socket under the repository's .git directory, and
+streams back the output and exit status. The server is started on first
+use, keeps the hook modules imported, and exits after IDLE_TIMEOUT seconds
+without requests. Each request runs in a process forked from the server,
+so hooks still see their own working directory, environment and logging
+configuration, and a failing hook cannot take the server down.
+
+Without the variable, on platforms without Unix sockets, or when the server
+cannot be reached or started, the hook runs in this process as if it had
+been started directly.
+"""
+
+import hashlib
+import importlib
+import json
+import os
+import socket
+import struct
+import subprocess
+import sys
+import time
+import traceback
+from types import ModuleType
+from typing import List, Optional, Set
+
+ENV_VAR = "PRECOMMIT_DAEMON"
+# Seconds without requests before the server exits, unless overridden by
+# the variable in the environment of the client starting it.
+IDLE_ENV_VAR = "PRECOMMIT_DAEMON_IDLE"
+IDLE_TIMEOUT = 600.0
+# Longest wait for a newly started server to accept connections.
+START_TIMEOUT = 3.0
+# The hooks served, by hook id.
+HOOKS = {
+    "PEP-672": "check_pep672_ascii",
+    "check-terratest-skip-env": "check_skip_env",
+    "conventional-pre-commit": "conventional_pre_commit",
+    "forbidden-files": "forbidden_files",
+}
+# Ends every response, followed by the exit status of the hook.
+_TRAILER = b"\0hook-exit:"
+_STATUS = struct.Struct(">i")
+_READ_SIZE = 1 << 16
+# sockaddr_un paths are limited to 108 bytes on Linux and 104 on macOS.
+_MAX_SOCKET_PATH = 100
+
+
+def _import_hook(name: str) -> ModuleType:
+    if __package__:
+        return importlib.import_module(f"{__package__}.{name}")
+    return importlib.import_module(name)
+
+
+def run_hook(argv: List[str]) -> int:
+    """Run a hook in this process and return its exit status."""
+    module = _import_hook(HOOKS[argv[0]])
+    sys.argv = [module.__file__] + argv[1:]
+    try:
+        module.main()
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    except Exception:
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+def git_dir(start: str) -> Optional[str]:
+    """Return the .git directory of the repository holding start."""
+    directory = os.path.abspath(start)
+    while True:
+        candidate = os.path.join(directory, ".git")
+        if os.path.isdir(candidate):
+            return candidate
+        if os.path.isfile(candidate):
+            # A worktree or submodule, .git holds the path of its git dir.
+            with open(candidate) as f:
+                line = f.readline().strip()
+            if line.startswith("gitdir:"):
+                return os.path.join(directory, line[len("gitdir:"):].strip())
+            return None
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def socket_path(cwd: str) -> Optional[str]:
+    """Return the server socket for a repository and this installation.
+
+    The name depends on the interpreter and on the hook sources, so
+    servers of other installations or of edited hooks are never reused.
+    """
+    directory = git_dir(cwd)
+    if directory is None:
+        return None
+    hooks_dir = os.path.dirname(os.path.abspath(__file__))
+    sources = [os.path.join(hooks_dir, name) for name in os.listdir(hooks_dir)
+               if name.endswith(".py")]
+    key = hashlib.sha1(json.dumps(
+        [sys.executable, hooks_dir,
+         max(os.stat(p).st_mtime for p in sources)]).encode()).hexdigest()
+    path = os.path.join(directory, f"hyperfine-pre-commit-{key[:12]}.sock")
+    return path if len(path) <= _MAX_SOCKET_PATH else None
+
+
+def _connect(path: str) -> Optional[socket.socket]:
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(path)
+    except OSError:
+        client.close()
+        return None
+    return client
+
+
+def connect(path: str) -> Optional[socket.socket]:
+    """Connect to the server, starting it if needed, or return None."""
+    client = _connect(path)
+    if client is not None:
+        return client
+    server = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--serve", path],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL, start_new_session=True)
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        client = _connect(path)
+        if client is not None:
+            return client
+        # The server exits at once if it cannot listen, or if another one
+        # started first, which is then connected to on the next attempt.
+        if server.poll() is not None and not os.path.exists(path):
+            return None
+        time.sleep(0.01)
+    return None
+
+
+def request(client: socket.socket, argv: List[str]) -> Optional[int]:
+    """Send a hook run to the server, stream its output, return its status.
+
+    Output is copied as it arrives, except for the last bytes which may
+    be the trailer holding the exit status. Returns None if the server
+    closed the connection without running the hook, as it does when it
+    shuts down with requests still queued.
+    """
+    out = sys.stdout.buffer
+    tail_size = len(_TRAILER) + _STATUS.size
+    tail = b""
+    received = False
+    try:
+        with client:
+            client.sendall(json.dumps(
+                {"argv": argv, "cwd": os.getcwd(),
+                 "env": dict(os.environ)}).encode() + b"\n")
+            for block in iter(lambda: client.recv(_READ_SIZE), b""):
+                received = True
+                tail += block
+                if len(tail) > tail_size:
+                    out.write(tail[:-tail_size])
+                    out.flush()
+                    tail = tail[-tail_size:]
+    except OSError:
+        pass
+    if not received:
+        return None
+    if len(tail) == tail_size and tail.startswith(_TRAILER):
+        return _STATUS.unpack(tail[len(_TRAILER):])[0]
+    out.write(tail)
+    out.flush()
+    print("pre-commit daemon: the hook ended without an exit status.",
+          file=sys.stderr)
+    return 1
+
+
+def _handle(conn: socket.socket) -> None:
+    """Run one request in a forked child, with conn as stdout and stderr."""
+    with conn.makefile("rb") as f:
+        message = json.loads(f.readline())
+    os.chdir(message["cwd"])
+    os.environ.clear()
+    os.environ.update(message["env"])
+    os.dup2(conn.fileno(), 1)
+    os.dup2(conn.fileno(), 2)
+    status = 1
+    try:
+        status = run_hook(message["argv"])
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        conn.sendall(_TRAILER + _STATUS.pack(status))
+        os._exit(status)
+
+
+def serve(path: str, idle_timeout: float = IDLE_TIMEOUT) -> None:
+    """Serve hook runs on a Unix socket until idle for idle_timeout."""
+    # Only on Unix, imported here so that clients elsewhere run the hooks.
+    import fcntl
+
+    # Only one server per socket, the others exit at once.
+    lock = open(path + ".lock", "w")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return
+    for name in HOOKS.values():
+        _import_hook(name)
+    os.umask(0o077)
+    if os.path.exists(path):
+        os.unlink(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(16)
+    server.settimeout(1.0)
+    children: Set[int] = set()
+    last_request = time.monotonic()
+    try:
+        while children or time.monotonic() - last_request < idle_timeout:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                conn = None
+            while children:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+                if not pid:
+                    break
+                children.discard(pid)
+            if conn is None:
+                continue
+            last_request = time.monotonic()
+            sys.stdout.flush()
+            sys.stderr.flush()
+            pid = os.fork()
+            if pid == 0:
+                server.close()
+                try:
+                    _handle(conn)
+                finally:
+                    os._exit(1)
+            children.add(pid)
+            conn.close()
+    finally:
+        # Unlink first, so new clients start another server instead of
+        # queueing on this one.
+        os.unlink(path)
+        server.close()
+        lock.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) == 2 and argv[0] == "--serve":
+        serve(argv[1], float(os.environ.get(IDLE_ENV_VAR) or IDLE_TIMEOUT))
+        return 0
+    if not argv or argv[0] not in HOOKS:
+        print(f"usage: daemon.py {{{','.join(sorted(HOOKS))}}} [args ...]",
+              file=sys.stderr)
+        return 2
+    if (os.environ.get(ENV_VAR, "") not in ("", "0")
+            and hasattr(socket, "AF_UNIX")):
+        path = socket_path(os.getcwd())
+        client = connect(path) if path is not None else None
+        if client is not None:
+            status = request(client, argv)
+            if status is not None:
+                return status
+    return run_hook(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
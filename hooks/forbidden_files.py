@@ -2,44 +2,140 @@
 """Script to prevent git editing of a list of protected files."""
 
 import argparse
+import fnmatch
+import os
+import re
 import subprocess
 import logging
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Iterable, List, Optional, Union
+
+try:
+    from . import instrument
+except ImportError:  # Run as a script from the hooks directory.
+    import instrument
 
 logger = logging.getLogger(__name__)
 
+_GLOB_CHARS = re.compile(r"[*?[]")
+
+
+class ProtectedPaths:
+    """Match repository paths against protected paths and patterns.
+
+    Entries are relative to the repository root, with "/" separators. An
+    entry ending in "/" protects everything under that directory, and an
+    entry with glob characters is matched with fnmatch against the whole
+    path, where "*" also matches "/". Entries with glob characters still
+    match the literal path, as in pages/[id].js, and are not used as
+    patterns at all when ``exists`` says the literal path exists. Exact
+    paths and directories are set lookups, and all globs are compiled into
+    a single regular expression, so a path is matched in time independent
+    of the number of entries.
+    """
+
+    def __init__(self, entries: Iterable[str],
+                 exists: Optional[Callable[[str], bool]] = None) -> None:
+        self.exact = set()
+        self.directories = set()
+        globs = []
+        for entry in entries:
+            if entry.endswith("/"):
+                self.directories.add(entry.rstrip("/"))
+            else:
+                self.exact.add(entry)
+            if _GLOB_CHARS.search(entry) and not (exists and exists(entry)):
+                globs.append(fnmatch.translate(entry))
+        self.glob = re.compile("|".join(globs)) if globs else None
+
+    def match(self, path: str) -> bool:
+        """Return whether a path is protected."""
+        if path in self.exact:
+            return True
+        if self.directories:
+            parent = path.rfind("/")
+            while parent > 0:
+                if path[:parent] in self.directories:
+                    return True
+                parent = path.rfind("/", 0, parent)
+        return bool(self.glob and self.glob.match(path))
+
+
+def normalize(entry: Union[str, Path], cwd: Path) -> str:
+    """Return a path or pattern relative to cwd, with "/" separators.
+
+    A trailing separator, marking a directory, is kept.
+    """
+    text = os.fspath(entry)
+    directory = text.endswith(("/", os.sep))
+    root = os.path.abspath(cwd)
+    path = os.path.normpath(os.path.join(root, text))
+    if path.startswith(root + os.sep):
+        path = path[len(root) + 1:]
+    else:
+        path = os.path.relpath(path, root)
+    path = path.replace(os.sep, "/")
+    return path + "/" if directory else path
 
-def protect_files(fpaths: List[Path], cwd: Path) -> None:
-    """Protect a set of files against git edits."""
-    edited_files = subprocess.run(["git", "diff", "--cached", "--name-only"],
-                                  check=True, encoding="utf-8",
-                                  capture_output=True, cwd=cwd).stdout
-    edited_paths = [cwd / Path(x) for x in edited_files.splitlines()]
-    for fpath in fpaths:
-        if fpath in edited_paths:
-            raise PermissionError(f"""Protected file {fpath} is staged.
-Unstage the file or restore it to its original contents.""")
 
+def staged_files(cwd: Path) -> List[str]:
+    """Return the staged paths, both sides of renames included."""
+    with instrument.timed("subprocess", "git diff"):
+        output = subprocess.run(
+            ["git", "diff", "--cached", "--name-only", "--no-renames", "-z"],
+            check=True, encoding="utf-8", capture_output=True,
+            cwd=cwd).stdout
+    return [name for name in output.split("\0") if name]
 
-def _get_file_list(paths_file: Path, paths_list: list, cwd: Path) -> List[Path]:
-    path_set = set()
+
+def protect_files(fpaths: Iterable[Union[str, Path]], cwd: Path) -> None:
+    """Protect a set of files against git edits.
+
+    Every staged file matching a protected path or pattern is reported in
+    a single PermissionError.
+    """
+    protected = ProtectedPaths(
+        (normalize(entry, cwd) for entry in fpaths),
+        exists=lambda entry: os.path.lexists(os.path.join(cwd, entry)))
+    violations = [path for path in staged_files(cwd)
+                  if protected.match(path)]
+    if violations:
+        listing = "\n".join(f"  {path}" for path in violations)
+        raise PermissionError(f"""Protected files are staged:
+{listing}
+Unstage the files or restore them to their original contents.""")
+
+
+def _get_file_list(paths_file: Path, paths_list: list, cwd: Path) -> List[str]:
+    entries = []
     if paths_file.is_file():
         with open(paths_file) as f:
             for line in f:
-                path_set.add(paths_file.parent / Path(line.strip()))
-    [path_set.add(cwd / Path(x)) for x in paths_list]
-    return list(path_set)
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    entries.append(os.path.join(paths_file.parent, line))
+    entries.extend(os.path.join(cwd, x) for x in paths_list)
+    return sorted(set(normalize(entry, cwd) for entry in entries))
 
 
-if __name__ == "__main__":
+def main() -> None:
     logging.basicConfig(level=logging.INFO)
     parser = argparse.ArgumentParser(description="Forbid certain file edits.")
     parser.add_argument("-l", "--list", type=str, default="",
-                        help="File, list of relative paths to protect.")
+                        help="File, list of relative paths to protect. Lines "
+                             "ending in / protect a directory, and lines "
+                             "with *, ? or [ are glob patterns, unless "
+                             "they name an existing path.")
     parser.add_argument("-f", "--files", type=str, default="", nargs="+",
-                        help="Whitespace-separated paths to protect.")
+                        help="Whitespace-separated paths or patterns to "
+                             "protect.")
     args = parser.parse_args()
     cwd = Path.cwd()
-    file_list = _get_file_list(cwd / Path(args.list), args.files, cwd)
-    protect_files(file_list, cwd)
+    with instrument.hook_run("forbidden-files") as stats:
+        file_list = _get_file_list(cwd / Path(args.list), args.files, cwd)
+        stats["files"] = len(file_list)
+        protect_files(file_list, cwd)
+
+
+if __name__ == "__main__":
+    main()
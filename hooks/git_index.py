@@ -0,0 +1,197 @@
+"""Read staged file contents straight from the git index.
+
+pre-commit hands hooks the paths of staged files. Looking their blob SHAs up
+with a single `git ls-files` call gives the hooks a content id for free, and
+a single long-lived `git cat-file --batch` process streams the staged
+contents, which is what is actually being committed, without hashing or
+opening every working tree file.
+"""
+
+import codecs
+import os
+import re
+import subprocess
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    from . import instrument
+except ImportError:  # Run as a script from the hooks directory.
+    import instrument
+
+_READ_SIZE = 1024 * 1024
+_shared_reader: Optional["BlobReader"] = None
+_shared_reader_pid = 0
+
+PathLike = Union[str, Path]
+# The first line number of a run of added lines, and their content.
+Hunk = Tuple[int, bytes]
+
+_HUNK_RE = re.compile(rb"^@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+def _key(path: PathLike, cwd: Path) -> str:
+    if os.path.isabs(path):
+        path = os.path.relpath(path, cwd)
+    return os.path.normpath(path)
+
+
+def staged_blobs(paths: List[PathLike],
+                 cwd: Optional[Path] = None) -> Dict[str, str]:
+    """Map the given paths to the SHAs of their staged blobs.
+
+    Paths that are not in the index, or a working directory that is not a
+    git repository, are left out of the result.
+    """
+    cwd = cwd or Path.cwd()
+    if not paths:
+        return {}
+    try:
+        with instrument.timed("subprocess", "git ls-files"):
+            listing = subprocess.run(
+                ["git", "ls-files", "--stage", "-z", "--"]
+                + [str(p) for p in paths],
+                check=True, capture_output=True, cwd=cwd).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+    staged = {}
+    for entry in listing.split(b"\0"):
+        if not entry:
+            continue
+        info, _, name = entry.partition(b"\t")
+        mode, sha, stage = info.split(b" ")
+        # Skip conflicted entries and submodules, they have no content here.
+        if stage == b"0" and mode != b"160000":
+            staged[os.path.normpath(os.fsdecode(name))] = sha.decode("ascii")
+    return {str(p): staged[_key(p, cwd)] for p in paths
+            if _key(p, cwd) in staged}
+
+
+def _diff_path(name: bytes) -> str:
+    """Return the path of a "+++ b/path" diff header, unquoting it."""
+    if name.startswith(b'"'):
+        name = codecs.escape_decode(name[1:-1])[0]
+    return os.path.normpath(os.fsdecode(name[len(b"b/"):]))
+
+
+def staged_hunks(paths: List[PathLike], cwd: Optional[Path] = None
+                 ) -> Optional[Dict[str, List[Hunk]]]:
+    """Map the given paths to the lines added by their staged changes.
+
+    A single `git diff --cached -U0` is streamed and only its added lines
+    are kept, so the cost follows the size of the change rather than the
+    size of the files. Paths without staged additions are left out.
+    Returns None when the diff cannot be read, e.g. outside a git
+    repository, so callers never mistake a failure for no additions.
+    """
+    cwd = cwd or Path.cwd()
+    if not paths:
+        return {}
+    wanted = {_key(p, cwd): str(p) for p in paths}
+    # Explicit prefixes and no external diff driver, whatever the config.
+    command = ["git", "-c", "core.quotePath=false", "diff", "--cached",
+               "-U0", "--no-color", "--no-ext-diff", "--no-renames",
+               "--relative", "--src-prefix=a/", "--dst-prefix=b/", "--"]
+    found: Dict[str, List[Hunk]] = {}
+    current: Optional[List[Hunk]] = None
+    added: List[bytes] = []
+    start = removed_left = added_left = 0
+    try:
+        with instrument.timed("subprocess", "git diff"):
+            proc = subprocess.Popen(command + [str(p) for p in paths],
+                                    stdout=subprocess.PIPE, cwd=cwd)
+            with proc.stdout:
+                for line in proc.stdout:
+                    if removed_left or added_left:
+                        if line.startswith(b"-"):
+                            removed_left -= 1
+                        elif line.startswith(b"+"):
+                            added_left -= 1
+                            added.append(line[1:])
+                            if not added_left and current is not None:
+                                current.append((start, b"".join(added)))
+                        continue
+                    match = _HUNK_RE.match(line)
+                    if match:
+                        removed_left = int(match.group(1) or 1)
+                        start = int(match.group(2))
+                        added_left = int(match.group(3) or 1)
+                        added = []
+                    elif line.startswith(b"+++ "):
+                        # Names with spaces are followed by a tab.
+                        name = line[4:].rstrip(b"\n").rstrip(b"\t")
+                        current = None
+                        if name != b"/dev/null":
+                            path = wanted.get(_diff_path(name))
+                            if path is not None:
+                                current = found.setdefault(path, [])
+            proc.wait()
+    except OSError:
+        return None
+    return found if proc.returncode == 0 else None
+
+
+class BlobReader:
+    """Stream blob contents from one `git cat-file --batch` process."""
+
+    def __init__(self, cwd: Optional[Path] = None) -> None:
+        self._proc = subprocess.Popen(
+            ["git", "cat-file", "--batch"], cwd=cwd or Path.cwd(),
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    def __enter__(self) -> "BlobReader":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def read(self, sha: str) -> bytes:
+        """Return the whole content of a blob."""
+        return b"".join(self.stream(sha, _READ_SIZE))
+
+    def stream(self, sha: str, chunk_size: int = _READ_SIZE
+               ) -> Iterator[bytes]:
+        """Yield the content of a blob in chunks of at most chunk_size.
+
+        The blob is consumed completely even if the caller stops iterating
+        early, so the next request starts on a clean stream.
+        """
+        stdin, stdout = self._proc.stdin, self._proc.stdout
+        stdin.write(sha.encode("ascii") + b"\n")
+        stdin.flush()
+        header = stdout.readline().split()
+        if len(header) != 3:
+            raise KeyError(f"Object {sha} is missing from the repository.")
+        remaining = int(header[2])
+        try:
+            while remaining:
+                chunk = stdout.read(min(chunk_size, remaining))
+                if not chunk:
+                    raise EOFError("git cat-file exited unexpectedly.")
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            while remaining:
+                skipped = len(stdout.read(min(_READ_SIZE, remaining)))
+                if not skipped:
+                    break
+                remaining -= skipped
+            # Every blob is followed by a newline.
+            stdout.read(1)
+
+    def close(self) -> None:
+        """Stop the git process."""
+        if self._proc.poll() is None:
+            self._proc.stdin.close()
+            self._proc.wait()
+        self._proc.stdout.close()
+
+
+def shared_reader() -> BlobReader:
+    """Return a BlobReader reused by every caller in this process."""
+    global _shared_reader, _shared_reader_pid
+    # A forked worker must not share the pipes of its parent's reader.
+    if _shared_reader is None or _shared_reader_pid != os.getpid():
+        _shared_reader = BlobReader()
+        _shared_reader_pid = os.getpid()
+    return _shared_reader
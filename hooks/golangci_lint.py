@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Run golangci-lint once over all packages with changed files.
+
+golangci-lint loads and type checks the whole program on every run, so
+running it per file repeats that work for every file. Instead the changed
+files are mapped to their packages, and a single run per Go module, the
+directory holding `go.mod`, lints all of those packages at once.
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    from . import result_cache, runner
+except ImportError:  # Run as a script from the hooks directory.
+    import result_cache
+    import runner
+
+
+def module_root(directory: str) -> str:
+    """Return the closest directory up to "." that holds a go.mod file."""
+    return runner.find_root(directory, "go.mod") or "."
+
+
+def module_packages(files: List[str]) -> Dict[str, List[str]]:
+    """Map each module root to the patterns of its changed packages."""
+    modules: Dict[str, List[str]] = {}
+    for directory in runner.group_by_dir(files):
+        root = module_root(directory)
+        package = os.path.relpath(directory, root)
+        modules.setdefault(root, []).append(f"./{package}")
+    return modules
+
+
+def persistent_cache_dir(cwd: Path) -> Path:
+    """Return the golangci-lint cache directory of a repository."""
+    repo = hashlib.sha256(str(cwd.resolve()).encode()).hexdigest()[:16]
+    return result_cache.default_cache_dir() / "golangci-lint" / repo
+
+
+def lint(task: runner.Task) -> runner.Result:
+    """Run golangci-lint for one module and report how long it took."""
+    start = time.perf_counter()
+    result = runner.run_task(task)
+    result.output += (f"--> golangci-lint in '{task.name}' took "
+                      f"{time.perf_counter() - start:.2f}s\n").encode()
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--persistent-cache", action="store_true",
+                        help="Keep the golangci-lint cache of this "
+                             "repository in the user cache directory, unless "
+                             "GOLANGCI_LINT_CACHE is set.")
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="Number of modules linted at once, "
+                             "0 for one per CPU.")
+    parser.add_argument("files", nargs="*", help="The changed Go files.")
+    args = parser.parse_args(argv)
+    os.environ["PATH"] += os.pathsep + runner.EXTRA_PATH
+    if args.persistent_cache and not os.environ.get("GOLANGCI_LINT_CACHE"):
+        cache_dir = persistent_cache_dir(Path.cwd())
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        os.environ["GOLANGCI_LINT_CACHE"] = str(cache_dir)
+    tasks = [runner.Task(root, [["golangci-lint", "run", "--new-from-rev",
+                                 "HEAD", *packages]], root)
+             for root, packages in module_packages(args.files).items()]
+    return runner.run_tasks(tasks, args.jobs, run=lint)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Run `helm lint` once on every Helm chart with changed files.
+
+`helm lint` can only run on the root of a chart, the directory holding
+`Chart.yaml`, so every changed file is resolved to its chart by walking up
+the tree until the current working directory. The runner memoizes lookups
+per directory, so sibling templates share one walk, and the distinct charts
+are linted concurrently.
+
+A chart's `values.yaml` may leave required values undefined, which makes
+the linter fail. If the chart has a `linter_values.yaml` file, it is
+combined with `values.yaml` to provide them.
+"""
+
+import argparse
+import logging
+import os
+import sys
+from typing import List, Optional
+
+try:
+    from . import runner
+except ImportError:  # Run as a script from the hooks directory.
+    import runner
+
+logger = logging.getLogger(__name__)
+
+LINTER_VALUES_FILE = "linter_values.yaml"
+
+
+def lint_command(chart: str) -> List[str]:
+    """Return the helm lint command for a chart."""
+    linter_values = os.path.join(chart, LINTER_VALUES_FILE)
+    if os.path.isfile(linter_values):
+        return ["helm", "lint", "-f", os.path.join(chart, "values.yaml"),
+                "-f", linter_values, chart]
+    return ["helm", "lint", chart]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="Number of charts linted at once, "
+                             "0 for one per CPU.")
+    parser.add_argument("files", nargs="*", help="The changed files.")
+    args = parser.parse_args(argv)
+    # Only log debug statements if PRECOMMIT_DEBUG is set.
+    logging.basicConfig(format="%(message)s", level=logging.DEBUG
+                        if os.environ.get("PRECOMMIT_DEBUG") else logging.INFO)
+    os.environ["PATH"] += os.pathsep + runner.EXTRA_PATH
+    tasks = []
+    for chart, files in runner.group_by_chart(args.files).items():
+        logger.debug(f"Resolved {', '.join(files)} to chart path {chart}")
+        tasks.append(runner.Task(chart, [lint_command(chart)]))
+    return runner.run_tasks(tasks, args.jobs)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""Opt-in timing records for the hooks.
+
+When the PRECOMMIT_PROFILE environment variable names a file, the hooks
+append one JSON object per line to it: one per hook run, per file checked
+and per subprocess started, with the wall time in seconds and, where known,
+the bytes scanned and the result cache hits. Summarize the records with
+``python -m hooks.profile_report``. Without the variable nothing is
+recorded and the overhead is a dictionary lookup.
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+ENV_VAR = "PRECOMMIT_PROFILE"
+
+# The hook running in this process, set by hook_run and inherited by
+# forked workers.
+_hook = ""
+
+
+def enabled() -> bool:
+    """Return whether records are being written."""
+    return bool(os.environ.get(ENV_VAR))
+
+
+def record(kind: str, name: str, seconds: float, **fields: Any) -> None:
+    """Append a record, if enabled, ignoring errors writing it."""
+    path = os.environ.get(ENV_VAR)
+    if not path:
+        return
+    line = json.dumps({"time": time.time(), "pid": os.getpid(),
+                       "hook": _hook, "kind": kind, "name": name,
+                       "seconds": round(seconds, 6), **fields})
+    try:
+        # Several hooks and workers append to the file at once, a single
+        # write per record in append mode keeps the lines whole.
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode("utf-8") + b"\n")
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+@contextmanager
+def timed(kind: str, name: str, **fields: Any) -> Iterator[Dict[str, Any]]:
+    """Record the wall time of the block.
+
+    The yielded dictionary holds extra fields of the record, which the
+    block may add to, e.g. the number of bytes it scanned.
+    """
+    extra = dict(fields)
+    if not enabled():
+        yield extra
+        return
+    start = time.perf_counter()
+    try:
+        yield extra
+    finally:
+        record(kind, name, time.perf_counter() - start, **extra)
+
+
+@contextmanager
+def hook_run(hook: str, **fields: Any) -> Iterator[Dict[str, Any]]:
+    """Record a whole hook run, labelling the records made during it."""
+    global _hook
+    previous, _hook = _hook, hook
+    try:
+        with timed("hook", hook, **fields) as extra:
+            yield extra
+    finally:
+        _hook = previous
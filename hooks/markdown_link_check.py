@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""Check the links of markdown files.
+
+All files are parsed in one process and every distinct link is checked
+once, however many files use it. Relative links, links starting with "/"
+(from the current working directory) and file:// links are resolved against
+an in-memory index of directory listings. External URLs are requested
+concurrently, and working ones are cached on disk for a while, so a link
+verified earlier is not requested again until its verdict expires.
+"""
+
+import argparse
+import logging
+import os
+import re
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+try:
+    from . import parallel, result_cache
+except ImportError:  # Run as a script from the hooks directory.
+    import parallel
+    import result_cache
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever a change alters the verdict for the same URL.
+CACHE_VERSION = 1
+DEFAULT_TTL_HOURS = 24.0
+DEFAULT_TIMEOUT = 10.0
+USER_AGENT = "hyperfine-pre-commit-link-check"
+
+_FENCE_RE = re.compile(r"^ {0,3}(```|~~~)")
+_CODE_SPAN_RE = re.compile(r"`+[^`]*`+")
+# Footnote definitions, [^1]: text, are not links.
+_REFERENCE_RE = re.compile(r"^ {0,3}\[(?!\^)[^\]]+\]:\s*<?(\S+?)>?(?:\s|$)")
+_AUTOLINK_RE = re.compile(r"<((?:https?|ftp|file)://[^>\s]+)>")
+_SCHEME_RE = re.compile(r"^[a-zA-Z][a-zA-Z0-9+.-]*:")
+_TITLE_CLOSE = {'"': '"', "'": "'", "(": ")"}
+
+
+def extract_links(text: str) -> List[Tuple[int, str]]:
+    """Return (line number, target) for the links of a markdown text.
+
+    Links in fenced code blocks and code spans are ignored.
+    """
+    links = []
+    fence = None
+    for number, line in enumerate(text.splitlines(), 1):
+        match = _FENCE_RE.match(line)
+        if match:
+            if fence is None:
+                fence = match.group(1)
+            elif match.group(1) == fence:
+                fence = None
+            continue
+        if fence is not None:
+            continue
+        line = _CODE_SPAN_RE.sub("", line)
+        links.extend((number, link) for link in inline_links(line))
+        for regex in (_REFERENCE_RE, _AUTOLINK_RE):
+            links.extend((number, m.group(1)) for m in regex.finditer(line))
+    return links
+
+
+def inline_links(line: str) -> List[str]:
+    """Return the destinations of the inline links and images of a line.
+
+    Every ``[`` is tried as the start of a link text, with nested brackets
+    balanced, so both the badge image and the link around it are found in
+    ``[![alt](image)](target)``.
+    """
+    links = []
+    for start, end in sorted(_bracket_pairs(line).items()):
+        if line[end + 1:end + 2] == "(":
+            link = _destination(line, end + 2)
+            if link:
+                links.append(link)
+    return links
+
+
+def _bracket_pairs(line: str) -> Dict[int, int]:
+    """Map the position of every matched ``[`` to that of its ``]``."""
+    pairs: Dict[int, int] = {}
+    opened: List[int] = []
+    backslashes = 0
+    for pos, char in enumerate(line):
+        if backslashes % 2 == 0:
+            if char == "[":
+                opened.append(pos)
+            elif char == "]" and opened:
+                pairs[opened.pop()] = pos
+        backslashes = backslashes + 1 if char == "\\" else 0
+    return pairs
+
+
+def _destination(line: str, pos: int) -> Optional[str]:
+    """Parse ``destination "title")`` from pos, return the destination."""
+    while line[pos:pos + 1].isspace():
+        pos += 1
+    if line[pos:pos + 1] == "<":
+        end = line.find(">", pos + 1)
+        if end == -1:
+            return None
+        link, pos = line[pos + 1:end], end + 1
+    else:
+        # Bare destinations hold no spaces, parentheses must be balanced.
+        depth, end = 0, pos
+        while end < len(line) and not line[end].isspace():
+            if line[end] == "(":
+                depth += 1
+            elif line[end] == ")":
+                if not depth:
+                    break
+                depth -= 1
+            end += 1
+        link, pos = line[pos:end], end
+    while line[pos:pos + 1].isspace():
+        pos += 1
+    if line[pos:pos + 1] in _TITLE_CLOSE:
+        pos = line.find(_TITLE_CLOSE[line[pos]], pos + 1)
+        if pos == -1:
+            return None
+        pos += 1
+        while line[pos:pos + 1].isspace():
+            pos += 1
+    return link if line[pos:pos + 1] == ")" else None
+
+
+class PathIndex:
+    """Answer existence queries from cached directory listings."""
+
+    def __init__(self) -> None:
+        self._listings: Dict[str, FrozenSet[str]] = {}
+
+    def exists(self, path: str) -> bool:
+        path = os.path.normpath(os.path.abspath(path))
+        parent, name = os.path.split(path)
+        if not name:
+            return True
+        return self.exists(parent) and name in self._listing(parent)
+
+    def _listing(self, directory: str) -> FrozenSet[str]:
+        if directory not in self._listings:
+            try:
+                with os.scandir(directory) as entries:
+                    listing = frozenset(entry.name for entry in entries)
+            except OSError:
+                listing = frozenset()
+            self._listings[directory] = listing
+        return self._listings[directory]
+
+
+def local_target(link: str, source: Path) -> Optional[str]:
+    """Return the local path a link points to, or None for a URL."""
+    if link.startswith("file://"):
+        return unquote(urlsplit(link).path)
+    # Protocol-relative links, //host/path, are URLs too.
+    if _SCHEME_RE.match(link) or link.startswith("//"):
+        return None
+    path = unquote(link.split("#", 1)[0].split("?", 1)[0])
+    if path.startswith("/"):
+        return os.path.join(os.getcwd(), path.lstrip("/"))
+    return os.path.join(os.path.dirname(source), path)
+
+
+def check_url(url: str, timeout: float) -> Optional[str]:
+    """Request a URL and return why it is dead, or None if it works."""
+    for method in ("HEAD", "GET"):
+        request = urllib.request.Request(
+            url, method=method, headers={"User-Agent": USER_AGENT})
+        try:
+            with urllib.request.urlopen(request, timeout=timeout):
+                return None
+        except urllib.error.HTTPError as e:
+            # Some servers do not implement HEAD, try again with GET.
+            if method == "HEAD" and e.code in (403, 405, 501):
+                continue
+            return f"Status: {e.code}"
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            return f"Error: {getattr(e, 'reason', e)}"
+    return None
+
+
+def check_files(files: List[Path], jobs: int = 0,
+                timeout: float = DEFAULT_TIMEOUT, ttl: float = 0.0,
+                cache: Optional[result_cache.ResultCache] = None
+                ) -> List[str]:
+    """Return an error message for every dead link in the files.
+
+    Working URLs are remembered in ``cache`` and trusted for ``ttl``
+    seconds.
+    """
+    index = PathIndex()
+    found = []
+    urls = set()
+    for fpath in files:
+        text = fpath.read_text(encoding="utf-8", errors="replace")
+        for line, link in extract_links(text):
+            if link.startswith("#") or link.startswith("mailto:"):
+                continue
+            target = local_target(link, fpath)
+            if target is None:
+                url = f"https:{link}" if link.startswith("//") else link
+                if url.startswith(("http://", "https://")):
+                    urls.add(url)
+                    found.append((fpath, line, link, url))
+            elif not index.exists(target):
+                found.append((fpath, line, link, None))
+    dead = _check_urls(sorted(urls), jobs, timeout, ttl, cache)
+    errors = []
+    # Dead local links have no URL.
+    for fpath, line, link, url in found:
+        reason = dead.get(url) if url is not None else "Not found"
+        if reason:
+            errors.append(f"{fpath}:{line}: [x] {link} -> {reason}")
+    return errors
+
+
+def _check_urls(urls: List[str], jobs: int, timeout: float, ttl: float,
+                cache: Optional[result_cache.ResultCache]
+                ) -> Dict[str, str]:
+    now = time.time()
+    todo = []
+    for url in urls:
+        checked = cache.get(url) if cache is not None else None
+        if checked is None or now - checked > ttl:
+            todo.append(url)
+    dead = {}
+    if not todo:
+        return dead
+    # Requests mostly wait on the network, so by default several run per CPU.
+    workers = min(jobs if jobs > 0 else parallel.resolve_jobs(0) * 4,
+                  len(todo))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        reasons = executor.map(lambda url: check_url(url, timeout), todo)
+        for url, reason in zip(todo, reasons):
+            if reason:
+                dead[url] = reason
+            elif cache is not None:
+                # Only working links are cached, a dead link is requested
+                # again once it is fixed.
+                cache.put(url, now)
+    return dead
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="Number of URLs requested at once, "
+                             "0 for four per CPU.")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help="Seconds to wait for each request.")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_TTL_HOURS,
+                        help="Hours a working URL is trusted without "
+                             "requesting it again.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Request every URL, ignoring cached results.")
+    parser.add_argument("files", nargs="*", help="The markdown files.")
+    args = parser.parse_args(argv)
+    cache = None
+    if not args.no_cache:
+        cache = result_cache.ResultCache("markdown-link-check",
+                                         CACHE_VERSION)
+    try:
+        errors = check_files([Path(f) for f in args.files], args.jobs,
+                             args.timeout, args.cache_ttl * 3600, cache)
+    finally:
+        if cache is not None:
+            cache.close()
+            logger.info(cache.summary())
+    if errors:
+        print("\n".join(errors))
+        print(f"ERROR: {len(errors)} dead links found.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""Process-pool helpers shared by the Python hooks."""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Sequence, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Each worker gets a few batches so that a slow file does not leave the
+# other workers idle at the end of the run.
+_BATCHES_PER_JOB = 4
+
+
+def resolve_jobs(jobs: int) -> int:
+    """Return the number of workers to use, 0 meaning one per CPU."""
+    if jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def map_batched(func: Callable[[T], R], items: Sequence[T], jobs: int = 1,
+                batch_size: int = 0) -> List[R]:
+    """Apply a picklable function to items over a process pool.
+
+    Items are sent to the workers in batches to amortize the cost of
+    pickling and inter-process communication. Results are returned in the
+    order of ``items`` regardless of which worker finished first.
+    """
+    jobs = min(resolve_jobs(jobs), len(items))
+    if jobs <= 1:
+        return [func(item) for item in items]
+    if batch_size <= 0:
+        batch_size = math.ceil(len(items) / (jobs * _BATCHES_PER_JOB))
+    batches = [items[i:i + batch_size]
+               for i in range(0, len(items), batch_size)]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(_run_batch, [func] * len(batches), batches)
+        return [result for batch in results for result in batch]
+
+
+def _run_batch(func: Callable[[T], R], batch: Sequence[T]) -> List[R]:
+    return [func(item) for item in batch]
@@ -0,0 +1,100 @@
+"""Summarize the timing records written with PRECOMMIT_PROFILE.
+
+Prints the hooks by total time, the slowest files and the subprocesses by
+total time:
+
+    PRECOMMIT_PROFILE=/tmp/profile.jsonl pre-commit run --all-files
+    python -m hooks.profile_report /tmp/profile.jsonl --top 10
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, TextIO
+
+try:
+    from . import instrument
+except ImportError:  # Run as a script from the hooks directory.
+    import instrument
+
+
+def read_records(path: str) -> List[Dict[str, Any]]:
+    """Return the records of a profile, skipping malformed lines."""
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+def _by_name(records: Iterable[Dict[str, Any]]
+             ) -> Dict[str, List[Dict[str, Any]]]:
+    groups: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for rec in records:
+        groups[rec["name"]].append(rec)
+    return groups
+
+
+def report(records: List[Dict[str, Any]], top: int = 10,
+           out: TextIO = sys.stdout) -> None:
+    """Print the slowest hooks, files and subprocesses of the records."""
+    kinds: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for rec in records:
+        kinds[rec.get("kind", "")].append(rec)
+
+    hooks = sorted(_by_name(kinds["hook"]).items(),
+                   key=lambda item: -sum(r["seconds"] for r in item[1]))
+    print(f"{'hook':<32} {'runs':>5} {'total (s)':>10} {'mean (s)':>9} "
+          f"{'max (s)':>8} {'cache hits':>11}", file=out)
+    for name, runs in hooks[:top]:
+        seconds = [r["seconds"] for r in runs]
+        hits = sum(r.get("cache_hits", 0) for r in runs)
+        lookups = hits + sum(r.get("cache_misses", 0) for r in runs)
+        cached = f"{hits}/{lookups}" if lookups else "-"
+        print(f"{name:<32} {len(runs):>5} {sum(seconds):>10.3f} "
+              f"{sum(seconds) / len(runs):>9.3f} {max(seconds):>8.3f} "
+              f"{cached:>11}", file=out)
+
+    files = sorted(kinds["file"], key=lambda r: -r["seconds"])
+    print(f"\n{'file':<48} {'hook':<24} {'seconds':>8} {'bytes':>10}",
+          file=out)
+    for rec in files[:top]:
+        print(f"{rec['name']:<48} {rec.get('hook', ''):<24} "
+              f"{rec['seconds']:>8.4f} {rec.get('bytes', ''):>10}", file=out)
+
+    processes = sorted(_by_name(kinds["subprocess"]).items(),
+                       key=lambda item: -sum(r["seconds"] for r in item[1]))
+    print(f"\n{'subprocess':<32} {'calls':>6} {'total (s)':>10} "
+          f"{'max (s)':>8}", file=out)
+    for name, calls in processes[:top]:
+        seconds = [r["seconds"] for r in calls]
+        print(f"{name:<32} {len(calls):>6} {sum(seconds):>10.3f} "
+              f"{max(seconds):>8.3f}", file=out)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", nargs="?",
+                        default=os.environ.get(instrument.ENV_VAR),
+                        help=f"The profile, ${instrument.ENV_VAR} by default.")
+    parser.add_argument("--top", type=int, default=10,
+                        help="Number of rows printed per table.")
+    args = parser.parse_args(argv)
+    if not args.path:
+        parser.error(f"no profile given and {instrument.ENV_VAR} is not set")
+    try:
+        records = read_records(args.path)
+    except OSError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    report(records, args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
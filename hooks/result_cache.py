@@ -0,0 +1,127 @@
+"""On-disk cache of per-file verdicts shared by the Python hooks.
+
+Verdicts are keyed by hook id, hook version, the options that influence the
+verdict and the content of the file, identified by its git blob SHA, so a
+renamed or reverted file is still a cache hit. Entries live in a single
+SQLite database and the least recently used ones are evicted once the cache
+holds more than ``max_entries``.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 100000
+_READ_SIZE = 1024 * 1024
+
+
+def default_cache_dir() -> Path:
+    """Return the directory holding caches shared across repositories."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "hyperfine-pre-commit"
+
+
+def blob_sha(fpath: Path) -> str:
+    """Return the git blob SHA of a file, the same as `git hash-object`."""
+    sha = hashlib.sha1(f"blob {fpath.stat().st_size}\0".encode("ascii"))
+    with open(fpath, "rb") as f:
+        for chunk in iter(lambda: f.read(_READ_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class ResultCache:
+    """Cache of JSON-serializable verdicts for one hook configuration."""
+
+    def __init__(self, hook_id: str, version: int,
+                 options: Optional[Dict[str, Any]] = None,
+                 path: Optional[Path] = None,
+                 max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.hits = 0
+        self.misses = 0
+        self._prefix = json.dumps([hook_id, version, options or {}],
+                                  sort_keys=True)
+        self._max_entries = max_entries
+        self._used: Dict[str, float] = {}
+        self._pending: Dict[str, str] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        path = path or default_cache_dir() / "results.sqlite3"
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), timeout=10)
+            # pre-commit runs batches of files through a hook concurrently,
+            # WAL lets them read while another process writes.
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS results ("
+                             "key TEXT PRIMARY KEY, verdict TEXT NOT NULL, "
+                             "used REAL NOT NULL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_used "
+                             "ON results (used)")
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Result cache {path} is unavailable: {e}")
+            self._db = None
+
+    def __enter__(self) -> "ResultCache":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def get(self, content_id: str) -> Optional[Any]:
+        """Return the cached verdict for some content, or None."""
+        if self._db is None:
+            self.misses += 1
+            return None
+        key = self._key(content_id)
+        row = self._db.execute("SELECT verdict FROM results WHERE key = ?",
+                               (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._used[key] = time.time()
+        return json.loads(row[0])
+
+    def put(self, content_id: str, verdict: Any) -> None:
+        """Store the verdict for some content, written out on close."""
+        if self._db is not None:
+            self._pending[self._key(content_id)] = json.dumps(verdict)
+
+    def close(self) -> None:
+        """Write pending changes and evict the least recently used entries."""
+        if self._db is None:
+            return
+        try:
+            now = time.time()
+            with self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                    [(key, verdict, now)
+                     for key, verdict in self._pending.items()])
+                self._db.executemany(
+                    "UPDATE results SET used = ? WHERE key = ?",
+                    [(used, key) for key, used in self._used.items()])
+                self._db.execute(
+                    "DELETE FROM results WHERE key IN (SELECT key FROM results"
+                    " ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                    (self._max_entries,))
+        except sqlite3.Error as e:
+            logger.warning(f"Could not update the result cache: {e}")
+        finally:
+            self._db.close()
+            self._db = None
+
+    def summary(self) -> str:
+        """Describe the hit and miss counters."""
+        return f"Result cache: {self.hits} hits, {self.misses} misses."
+
+    def _key(self, content_id: str) -> str:
+        return hashlib.sha256(
+            f"{self._prefix}\0{content_id}".encode("utf-8")).hexdigest()
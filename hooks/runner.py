@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""Run external tools over groups of files with a bounded thread pool.
+
+Instead of starting one tool process per file, a hook groups its files,
+per file, directory, Go package or Helm chart, and starts one process per
+group. Groups run concurrently and the output of every group is buffered,
+then printed in the order of the groups, so parallel output is never
+interleaved. The exit status of the hook is the worst exit status of any
+command.
+
+Most tool hooks are a declarative HookSpec. Hooks that need more, such as
+caching or tool-specific setup, live in their own module built on the same
+engine, and this script dispatches to them:
+
+    runner.py HOOK_ID [OPTIONS] FILE...
+"""
+
+import argparse
+import importlib
+import os
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from types import ModuleType
+from typing import (BinaryIO, Callable, Dict, Iterator, List, Optional, Set,
+                    Tuple, Union)
+
+try:
+    from . import instrument, parallel
+except ImportError:  # Run as a script from the hooks directory.
+    import instrument
+    import parallel
+
+# OSX GUI apps do not pick up environment variables the same way as Terminal
+# apps, see https://stackoverflow.com/q/135688/483528. As a workaround to
+# allow GitHub Desktop to work, tools are also looked up here.
+EXTRA_PATH = "/usr/local/bin"
+# The exit status of a shell for a command that is not installed.
+NOT_FOUND = 127
+
+
+@dataclass
+class Task:
+    """Commands run in sequence for one group of files."""
+
+    name: str
+    commands: List[List[str]]
+    cwd: Optional[str] = None
+    # Printed before the output of the commands.
+    header: str = ""
+
+
+@dataclass
+class Result:
+    """The combined output and worst exit status of a task."""
+
+    task: Task
+    returncode: int
+    output: bytes
+    seconds: float = 0.0
+
+
+def run_command(command: List[str], cwd: Optional[str] = None,
+                env: Optional[Dict[str, str]] = None) -> Tuple[int, bytes]:
+    """Run a command and return its exit status and combined output."""
+    with instrument.timed("subprocess", command[0], cwd=cwd or "."):
+        try:
+            proc = subprocess.run(command, cwd=cwd, env=env,
+                                  stdout=subprocess.PIPE,
+                                  stderr=subprocess.STDOUT)
+        except FileNotFoundError:
+            return NOT_FOUND, f"{command[0]}: command not found\n".encode()
+    return proc.returncode, proc.stdout
+
+
+def run_task(task: Task) -> Result:
+    """Run every command of a task, even if an earlier one failed."""
+    start = time.perf_counter()
+    returncode = 0
+    output = [task.header.encode()]
+    for command in task.commands:
+        status, stdout = run_command(command, task.cwd)
+        output.append(stdout)
+        returncode = max(returncode, status)
+    return Result(task, returncode, b"".join(output),
+                  time.perf_counter() - start)
+
+
+def run_tasks(tasks: List[Task], jobs: int = 0,
+              out: Optional[BinaryIO] = None,
+              run: Callable[[Task], Result] = run_task,
+              timing: bool = False) -> int:
+    """Run tasks concurrently and return the worst exit status.
+
+    The output of each task is written to ``out`` once the task and all the
+    tasks before it have finished, followed by its duration with
+    ``timing``. Hooks that need more than a list of commands per task pass
+    their own ``run`` function.
+    """
+    out = out or sys.stdout.buffer
+    returncode = 0
+    workers = max(min(parallel.resolve_jobs(jobs), len(tasks)), 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(run, tasks):
+            out.write(result.output)
+            if timing:
+                out.write(f"--> '{result.task.name}' took "
+                          f"{result.seconds:.2f}s\n".encode())
+            out.flush()
+            returncode = max(returncode, result.returncode)
+    return returncode
+
+
+def group_by_file(files: List[str]) -> Dict[str, List[str]]:
+    """Put every file in a group of its own."""
+    return {fpath: [fpath] for fpath in files}
+
+
+def group_by_dir(files: List[str]) -> Dict[str, List[str]]:
+    """Group files by their directory, in order of first appearance."""
+    groups: Dict[str, List[str]] = {}
+    for fpath in files:
+        groups.setdefault(os.path.dirname(fpath) or ".", []).append(fpath)
+    return groups
+
+
+@lru_cache(maxsize=None)
+def find_root(directory: str, marker: str) -> Optional[str]:
+    """Return the closest directory holding a ``marker`` file.
+
+    The walk goes up from ``directory`` but not above the working
+    directory. Lookups are memoized, so files in the same or sibling
+    directories share the walk.
+    """
+    if os.path.isfile(os.path.join(directory, marker)):
+        return directory
+    parent = os.path.dirname(directory)
+    if (directory in (".", os.path.realpath(os.getcwd()))
+            or parent == directory):
+        return None
+    return find_root(parent or ".", marker)
+
+
+def group_by_root(files: List[str], marker: str) -> Dict[str, List[str]]:
+    """Group files by the closest directory holding a ``marker`` file.
+
+    Files outside of any such directory are left out.
+    """
+    groups: Dict[str, List[str]] = {}
+    for fpath in files:
+        directory = fpath if os.path.isdir(fpath) else os.path.dirname(fpath)
+        root = find_root(os.path.normpath(directory or "."), marker)
+        if root is not None:
+            groups.setdefault(root, []).append(fpath)
+    return groups
+
+
+def group_by_chart(files: List[str]) -> Dict[str, List[str]]:
+    """Group files by Helm chart, the directory holding Chart.yaml."""
+    return group_by_root(files, "Chart.yaml")
+
+
+GROUPERS: Dict[str, Callable[[List[str]], Dict[str, List[str]]]] = {
+    "file": group_by_file,
+    "dir": group_by_dir,
+    # A Go package is a directory.
+    "package": group_by_dir,
+    "chart": group_by_chart,
+}
+
+
+@dataclass
+class HookSpec:
+    """How a hook turns its files into one command per group of files.
+
+    In ``command`` and ``header``, "{dir}" is replaced by the group, and a
+    "{files}" argument by the files of the group. With ``chdir`` the command
+    runs in the group directory. Files not matching ``pattern`` are
+    skipped.
+    """
+
+    command: List[str]
+    group: str = "dir"
+    chdir: bool = False
+    header: str = ""
+    pattern: str = ""
+
+    def tasks(self, files: List[str]) -> List[Task]:
+        """Return one task per group of the given files."""
+        if self.pattern:
+            files = [f for f in files if re.search(self.pattern, f)]
+        tasks = []
+        for key, group in GROUPERS[self.group](files).items():
+            command = []
+            for arg in self.command:
+                if arg == "{files}":
+                    command.extend(group)
+                else:
+                    command.append(arg.replace("{dir}", key))
+            tasks.append(Task(key, [command], key if self.chdir else None,
+                              self.header.replace("{dir}", key)))
+        return tasks
+
+
+def _hcl_files(directory: str) -> Iterator[str]:
+    # The files `terragrunt hclfmt` formats when run in a directory.
+    for root, dirs, names in os.walk(directory):
+        dirs[:] = [d for d in dirs
+                   if d not in (".terraform", ".terragrunt-cache")]
+        for name in names:
+            if name.endswith(".hcl"):
+                yield os.path.normpath(os.path.join(root, name))
+
+
+def _all_changed(directory: str, changed: Set[str]) -> bool:
+    # Whether several files are under a directory and all of them changed,
+    # the walk stops at the first file that did not.
+    count = 0
+    for fpath in _hcl_files(directory):
+        if fpath not in changed:
+            return False
+        count += 1
+    return count > 1
+
+
+def _terragrunt_hclfmt(files: List[str]) -> List[Task]:
+    # hclfmt formats either one file or every file under a directory. A
+    # directory is formatted by one process when all its files changed,
+    # which is the case when running on all files, and file by file
+    # otherwise.
+    changed = {os.path.normpath(fpath) for fpath in files}
+    groups = group_by_dir(files)
+    whole_dirs = [directory for directory in groups
+                  if _all_changed(directory, changed)]
+    tasks = []
+    for directory, group in groups.items():
+        if any(parent != directory and (parent == "." or directory.startswith(
+                os.path.join(parent, ""))) for parent in whole_dirs):
+            continue
+        if directory in whole_dirs:
+            tasks.append(Task(directory, [[
+                "terragrunt", "hclfmt", "--terragrunt-working-dir",
+                directory]]))
+        else:
+            tasks.append(Task(directory, [
+                ["terragrunt", "hclfmt", "--terragrunt-hclfmt-file",
+                 os.path.basename(fpath)] for fpath in group], directory))
+    return tasks
+
+
+YAPF_STYLE = ("{BASED_ON_STYLE: google, "
+              "ALIGN_CLOSING_BRACKET_WITH_VISUAL_INDENT: true, "
+              "COLUMN_LIMIT: 120, BLANK_LINE_BEFORE_NESTED_CLASS_OR_DEF: true, "
+              "COALESCE_BRACKETS: false, DEDENT_CLOSING_BRACKETS: true, "
+              "SPLIT_BEFORE_DOT: true, SPLIT_COMPLEX_COMPREHENSION: true}")
+
+HOOKS: Dict[str, Union[HookSpec, Callable[[List[str]], List[Task]]]] = {
+    # terraform and sentinel fmt accept several files.
+    "terraform-fmt": HookSpec(["terraform", "fmt", "-diff", "-check",
+                               "{files}"]),
+    "sentinel-fmt": HookSpec(["sentinel", "fmt", "-diff", "-check",
+                              "{files}"]),
+    # Go tools work on whole packages.
+    "gofmt": HookSpec(["go", "fmt", "./{dir}"], group="package"),
+    "goimports": HookSpec(["goimports", "-l", "-w", "./{dir}"],
+                          group="package"),
+    "golint": HookSpec(["golint", "-set_exit_status", "./{dir}"],
+                       group="package"),
+    "packer-validate": HookSpec(
+        ["packer", "validate", "-syntax-only", "."], chdir=True,
+        header="--> Running 'packer validate -syntax-only' in directory "
+               "'{dir}'\n"),
+    "yapf": HookSpec(["yapf", "-ri", f"--style={YAPF_STYLE}", "{files}"],
+                     pattern=r"\.py$"),
+    "terragrunt-hclfmt": _terragrunt_hclfmt,
+}
+
+# Hooks implemented by their own module, which has a main(argv) function.
+MODULE_HOOKS = {
+    "terraform-validate": "terraform_validate",
+    "tflint": "tflint",
+    "golangci-lint": "golangci_lint",
+    "helmlint": "helmlint",
+    "shellcheck": "shellcheck",
+    "markdown-link-check": "markdown_link_check",
+}
+
+
+def hook_tasks(hook: str, files: List[str]) -> List[Task]:
+    """Return the tasks of a hook of HOOKS for the given files."""
+    spec = HOOKS[hook]
+    if isinstance(spec, HookSpec):
+        return spec.tasks(files)
+    return spec(files)
+
+
+def _import_hook(name: str) -> ModuleType:
+    if __package__:
+        return importlib.import_module(f"{__package__}.{name}")
+    return importlib.import_module(name)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in MODULE_HOOKS:
+        with instrument.hook_run(argv[0]):
+            return _import_hook(MODULE_HOOKS[argv[0]]).main(argv[1:])
+    parser = argparse.ArgumentParser(
+        description="Run a tool hook over groups of files.")
+    parser.add_argument("hook", choices=sorted([*HOOKS, *MODULE_HOOKS]),
+                        help="The hook to run.")
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="Number of tool processes running at once, "
+                             "0 for one per CPU.")
+    parser.add_argument("--timing", action="store_true",
+                        help="Print how long each group of files took.")
+    parser.add_argument("files", nargs="*", help="The files to check.")
+    args = parser.parse_args(argv)
+    os.environ["PATH"] += os.pathsep + EXTRA_PATH
+    with instrument.hook_run(args.hook, files=len(args.files)):
+        return run_tasks(hook_tasks(args.hook, args.files), args.jobs,
+                         timing=args.timing)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
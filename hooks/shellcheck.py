@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Run shellcheck on every file with a shell shebang.
+
+Shebangs are classified by reading only the first line of each file, and
+the scripts are passed to a few shellcheck processes, one chunk of files
+per worker, rather than one process per script. Files with a shell
+extension but no shebang fail the hook.
+"""
+
+import argparse
+import math
+import os
+import re
+import sys
+from typing import List, Optional
+
+try:
+    from . import parallel, runner
+except ImportError:  # Run as a script from the hooks directory.
+    import parallel
+    import runner
+
+SHEBANG_RE = re.compile(rb"^#!(?:/|/.*/|/.* )(?:(?:ba|da|k|a)*sh|bats)$")
+SHELL_EXTENSION_RE = re.compile(r".+\.(?:sh|bash|dash|ksh|ash|bats)$")
+# A shebang longer than this is not one we are looking for.
+_MAX_SHEBANG = 256
+
+
+def has_shell_shebang(fpath: str) -> bool:
+    """Return whether the first line of a file is a shell shebang."""
+    try:
+        with open(fpath, "rb") as f:
+            first_line = f.readline(_MAX_SHEBANG)
+    except OSError:
+        return False
+    return bool(SHEBANG_RE.match(first_line.rstrip(b"\r\n")))
+
+
+def chunks(items: List[str], jobs: int) -> List[List[str]]:
+    """Split items into at most ``jobs`` chunks of about the same size."""
+    if not items:
+        return []
+    size = math.ceil(len(items) / max(parallel.resolve_jobs(jobs), 1))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--enable", action="append", default=[],
+                        help="Optional shellcheck checks to enable, can be "
+                             "given several times.")
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="Number of shellcheck processes, "
+                             "0 for one per CPU.")
+    parser.add_argument("files", nargs="*", help="The files to check.")
+    argv = sys.argv[1:] if argv is None else argv
+    # Hook args such as "--enable a,b" arrive as a single argument.
+    args = parser.parse_args([part for arg in argv
+                              for part in (arg.split(" ", 1)
+                                           if arg.startswith("--enable ")
+                                           else [arg])])
+    os.environ["PATH"] += os.pathsep + runner.EXTRA_PATH
+    returncode = 0
+    scripts = []
+    for fpath in args.files:
+        if has_shell_shebang(fpath):
+            scripts.append(fpath)
+        elif SHELL_EXTENSION_RE.match(fpath):
+            print(f"{fpath}: missing shebang")
+            returncode = 1
+    command = ["shellcheck"]
+    if args.enable:
+        command.append("--enable=" + ",".join(
+            check for value in args.enable for check in value.split()))
+    tasks = [runner.Task(chunk[0], [command + chunk])
+             for chunk in chunks(scripts, args.jobs)]
+    sys.stdout.flush()
+    return max(returncode, runner.run_tasks(tasks, args.jobs))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
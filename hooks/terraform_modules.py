@@ -0,0 +1,146 @@
+"""Index of the local modules each Terraform module calls.
+
+Every .tf file is parsed for the ``module`` blocks whose source is a local
+path, giving which module directories call which. The index is kept on
+disk and a file is only parsed again when its size or modification time
+changed, or when it is among the changed files. From the changed files the
+callers are followed up to the root modules, the modules no other module
+calls, which are the ones worth validating.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+try:
+    from . import result_cache, walk
+except ImportError:  # Run as a script from the hooks directory.
+    import result_cache
+    import walk
+
+INDEX_VERSION = 1
+
+_MODULE_RE = re.compile(r'^\s*module\s+"[^"]*"\s*\{', re.MULTILINE)
+_SOURCE_RE = re.compile(r'(?:^|\{)\s*source\s*=\s*"(\.\.?/[^"]*)"',
+                        re.MULTILINE)
+_BRACE_RE = re.compile(r"[{}]")
+
+
+def block(content: str, start: int, body: int) -> str:
+    """Return the block from ``start`` to the brace closing at ``body``."""
+    depth = 1
+    for match in _BRACE_RE.finditer(content, body):
+        depth += 1 if match.group() == "{" else -1
+        if not depth:
+            return content[start:match.end()]
+    return content[start:]
+
+
+def local_sources(content: str, directory: str) -> List[str]:
+    """Return the directories of the local modules called in a file."""
+    sources = []
+    for match in _MODULE_RE.finditer(content):
+        source = _SOURCE_RE.search(block(content, match.start(), match.end()))
+        if source:
+            sources.append(os.path.normpath(
+                os.path.join(directory, source.group(1))))
+    return sources
+
+
+def index_path(root: str = ".") -> Path:
+    """Return where the index of a repository is kept."""
+    key = hashlib.sha256(os.path.realpath(root).encode()).hexdigest()
+    return (result_cache.default_cache_dir() / "terraform-modules"
+            / f"{key[:16]}.json")
+
+
+def load_index(root: str = ".", changed: Iterable[str] = (),
+               path: Optional[Path] = None) -> Dict[str, List[str]]:
+    """Return the local module directories called by every .tf file.
+
+    Paths are relative to root. Files are parsed again when they are in
+    ``changed`` or their size or modification time differs from the
+    stored index, which is then updated.
+    """
+    path = path or index_path(root)
+    try:
+        stored = json.loads(path.read_text())
+        if stored.get("version") != INDEX_VERSION:
+            stored = {}
+    except (OSError, ValueError):
+        stored = {}
+    entries = stored.get("files", {})
+    changed = {os.path.normpath(f) for f in changed}
+    updated: Dict[str, list] = {}
+    for fpath in walk.find_files(root, [".tf"]):
+        name = os.path.relpath(fpath, root)
+        try:
+            stat = os.stat(fpath)
+        except OSError:
+            continue
+        entry = entries.get(name)
+        if (entry is None or name in changed
+                or entry[:2] != [stat.st_mtime_ns, stat.st_size]):
+            content = fpath.read_text(errors="replace")
+            entry = [stat.st_mtime_ns, stat.st_size,
+                     local_sources(content, os.path.dirname(name) or ".")]
+        updated[name] = entry
+    if updated != entries:
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps({"version": INDEX_VERSION,
+                                       "files": updated}))
+            os.replace(str(tmp), str(path))
+        except OSError:
+            pass
+    return {name: entry[2] for name, entry in updated.items()}
+
+
+def called_modules(directory: str,
+                   index: Dict[str, List[str]]) -> List[str]:
+    """Return the modules a module calls, directly or through others."""
+    calls: Dict[str, Set[str]] = {}
+    for name, sources in index.items():
+        calls.setdefault(os.path.dirname(name) or ".", set()).update(sources)
+    directory = os.path.normpath(directory)
+    seen = {directory}
+    stack = [directory]
+    while stack:
+        for source in calls.get(stack.pop(), ()):
+            if source not in seen:
+                seen.add(source)
+                stack.append(source)
+    seen.discard(directory)
+    return sorted(seen)
+
+
+def affected_roots(files: Iterable[str],
+                   index: Dict[str, List[str]]) -> List[str]:
+    """Return the root modules affected by changes to files.
+
+    A root module is affected when it holds one of the files, or calls a
+    module holding one, directly or through other modules.
+    """
+    modules = {os.path.dirname(name) or "." for name in index}
+    callers: Dict[str, Set[str]] = {}
+    for name, sources in index.items():
+        for source in sources:
+            callers.setdefault(source, set()).add(
+                os.path.dirname(name) or ".")
+    roots = set()
+    seen: Set[str] = set()
+    stack = [os.path.normpath(os.path.dirname(f) or ".") for f in files]
+    while stack:
+        directory = stack.pop()
+        if directory in seen:
+            continue
+        seen.add(directory)
+        if directory in callers:
+            stack.extend(callers[directory])
+        elif directory in modules:
+            roots.add(directory)
+    return sorted(roots)
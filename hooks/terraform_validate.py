@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Run `terraform validate` in every root module affected by changed files.
+
+A root module is affected when it holds a changed file or calls a module
+holding one, directly or through other local modules, see
+terraform_modules.py. Root modules are validated concurrently, each once.
+Providers are shared across directories and repositories through a plugin
+cache, and `terraform init` is skipped when neither the dependency lock
+file nor the provider and module requirements of a directory changed since
+its last successful init. Terraform does not support concurrent use of
+the plugin cache, so inits run one at a time while validations run in
+parallel.
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+try:
+    from . import result_cache, runner, terraform_modules
+except ImportError:  # Run as a script from the hooks directory.
+    import result_cache
+    import runner
+    import terraform_modules
+
+# Written to .terraform/ after a successful init, holding the hash of the
+# inputs of that init.
+STAMP_FILE = "pre-commit-init.sha256"
+LOCK_FILE = ".terraform.lock.hcl"
+
+# Blocks whose content decides what `terraform init` installs.
+_INIT_BLOCK_RE = re.compile(
+    r'^\s*(?:terraform|(?:module|provider)\s+"[^"]*")\s*\{', re.MULTILINE)
+# Resources and data sources also require the provider named by the prefix
+# of their type, even when no block declares it.
+_RESOURCE_TYPE_RE = re.compile(
+    r'^\s*(?:resource|data|ephemeral)\s+"([A-Za-z0-9-]+)_', re.MULTILINE)
+_init_lock = threading.Lock()
+
+
+def init_inputs_hash(directory: Path, called: Iterable[str] = ()) -> str:
+    """Hash what decides the providers and modules init installs.
+
+    That is the lock file, the terraform, module and provider blocks, and
+    the providers implied by resource and data source types. The local
+    modules in ``called`` are hashed too, since init also installs what
+    they require.
+    """
+    sha = hashlib.sha256()
+    lock_file = directory / LOCK_FILE
+    if lock_file.is_file():
+        sha.update(lock_file.read_bytes())
+    for module in [directory, *(Path(m) for m in called)]:
+        sha.update(f"{module}\0".encode())
+        providers = set()
+        for tf_file in sorted(module.glob("*.tf")):
+            content = tf_file.read_text(errors="replace")
+            for match in _INIT_BLOCK_RE.finditer(content):
+                sha.update(terraform_modules.block(
+                    content, match.start(), match.end()).encode())
+            providers.update(_RESOURCE_TYPE_RE.findall(content))
+        sha.update(f"\0{','.join(sorted(providers))}\0".encode())
+    return sha.hexdigest()
+
+
+def validate(task: runner.Task,
+             index: Optional[Dict[str, List[str]]] = None) -> runner.Result:
+    """Init a directory when needed, then validate it.
+
+    With the module ``index`` of terraform_modules.load_index, a change
+    to what a called local module requires also makes init run.
+    """
+    directory = Path(task.cwd)
+    output = [f"--> Running 'terraform validate' in directory "
+              f"'{task.name}'\n".encode()]
+    start = time.perf_counter()
+    returncode = 0
+    called = terraform_modules.called_modules(task.cwd, index or {})
+    inputs = init_inputs_hash(directory, called)
+    stamp = directory / ".terraform" / STAMP_FILE
+    init = "skipped"
+    if not stamp.is_file() or stamp.read_text() != inputs:
+        with _init_lock:
+            returncode, stdout = runner.run_command(
+                ["terraform", "init", "-backend=false"], task.cwd)
+        output.append(stdout)
+        init = "done" if returncode == 0 else "failed"
+        if returncode == 0:
+            stamp.parent.mkdir(exist_ok=True)
+            stamp.write_text(inputs)
+    status, stdout = runner.run_command(["terraform", "validate"], task.cwd)
+    output.append(stdout)
+    returncode = max(returncode, status)
+    output.append(f"--> '{task.name}' took "
+                  f"{time.perf_counter() - start:.2f}s (init {init})\n"
+                  .encode())
+    return runner.Result(task, returncode, b"".join(output))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="Number of directories validated at once, "
+                             "0 for one per CPU.")
+    parser.add_argument("files", nargs="*", help="The changed files.")
+    args = parser.parse_args(argv)
+    os.environ["PATH"] += os.pathsep + runner.EXTRA_PATH
+    # Disable output not usually helpful when running in automation, such
+    # as guidance to run plan after init.
+    os.environ["TF_IN_AUTOMATION"] = "1"
+    if not os.environ.get("TF_PLUGIN_CACHE_DIR"):
+        plugin_cache = result_cache.default_cache_dir() / "terraform-plugins"
+        plugin_cache.mkdir(parents=True, exist_ok=True)
+        os.environ["TF_PLUGIN_CACHE_DIR"] = str(plugin_cache)
+    index = terraform_modules.load_index(changed=args.files)
+    tasks = [runner.Task(directory, [], directory)
+             for directory in terraform_modules.affected_roots(args.files,
+                                                               index)]
+    return runner.run_tasks(tasks, args.jobs, run=partial(validate,
+                                                          index=index))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
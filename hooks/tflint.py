@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Run tflint once per module directory with changed files.
+
+Each directory is linted by a single tflint process with a `--filter` per
+changed file, so a module and its plugins are loaded once per directory
+rather than once per file, and directories are linted concurrently.
+`tflint --init` is skipped when `.tflint.hcl` is unchanged since the last
+successful init in this repository, and the plugin directories were not
+removed or emptied since.
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+try:
+    from . import result_cache, runner
+except ImportError:  # Run as a script from the hooks directory.
+    import result_cache
+    import runner
+
+CONFIG_FILE = ".tflint.hcl"
+
+
+def plugin_dirs(cwd: Path) -> List[Path]:
+    """Return the directories tflint looks for plugins in."""
+    if os.environ.get("TFLINT_PLUGIN_DIR"):
+        return [Path(os.environ["TFLINT_PLUGIN_DIR"])]
+    return [cwd / ".tflint.d" / "plugins",
+            Path.home() / ".tflint.d" / "plugins"]
+
+
+def init_state(cwd: Path) -> str:
+    """Hash the tflint configuration and the state of the plugin directories.
+
+    A plugin directory that is removed, or whose entries change, changes
+    its modification time and so the hash.
+    """
+    sha = hashlib.sha256()
+    config = cwd / CONFIG_FILE
+    if config.is_file():
+        sha.update(config.read_bytes())
+    for directory in plugin_dirs(cwd):
+        try:
+            mtime = str(directory.stat().st_mtime_ns)
+        except OSError:
+            mtime = "missing"
+        sha.update(f"\0{directory}\0{mtime}".encode())
+    return sha.hexdigest()
+
+
+def init_stamp(cwd: Path) -> Path:
+    """Return the file recording the init state of the last init in cwd."""
+    repo = hashlib.sha256(str(cwd.resolve()).encode()).hexdigest()
+    return result_cache.default_cache_dir() / "tflint-init" / repo
+
+
+def init_plugins(cwd: Path) -> int:
+    """Install the plugins of the config unless nothing changed."""
+    stamp = init_stamp(cwd)
+    if stamp.is_file() and stamp.read_text() == init_state(cwd):
+        return 0
+    returncode, output = runner.run_command(["tflint", "--init"], str(cwd))
+    sys.stdout.buffer.write(output)
+    sys.stdout.flush()
+    if returncode == 0:
+        try:
+            stamp.parent.mkdir(parents=True, exist_ok=True)
+            # The state after init, which installs into the plugin dirs.
+            stamp.write_text(init_state(cwd))
+        except OSError:
+            pass
+    return returncode
+
+
+def lint_tasks(files: List[str], tool_args: List[str]) -> List[runner.Task]:
+    """Return one tflint task per directory, filtering on its files."""
+    tasks = []
+    for directory, group in runner.group_by_dir(files).items():
+        filters = [arg for fpath in group
+                   for arg in ("--filter", os.path.basename(fpath))]
+        tasks.append(runner.Task(directory, [
+            ["tflint", *tool_args, "--chdir", directory, *filters]]))
+    return tasks
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        epilog="Other options are passed on to tflint.")
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="Number of directories linted at once, "
+                             "0 for one per CPU.")
+    args, rest = parser.parse_known_args(argv)
+    tool_args = [arg for arg in rest if arg.startswith("-")]
+    files = [arg for arg in rest if not arg.startswith("-")]
+    os.environ["PATH"] += os.pathsep + runner.EXTRA_PATH
+    returncode = init_plugins(Path.cwd())
+    if returncode:
+        return returncode
+    return runner.run_tasks(lint_tasks(files, tool_args), args.jobs)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Find the files with some extensions under a directory.
+
+Inside a git work tree the files come from a single streamed
+`git ls-files`, tracked and untracked ones alike, minus those ignored by
+.gitignore and the other standard exclude files. Elsewhere the tree is
+walked with os.scandir. Either way directories that only hold generated or
+third-party files are pruned, extensions are compared against a set before
+anything is stat'ed, and matching files are yielded as they are found.
+"""
+
+import os
+import subprocess
+from pathlib import Path
+from typing import Iterable, Iterator, Union
+
+try:
+    from . import instrument
+except ImportError:  # Run as a script from the hooks directory.
+    import instrument
+
+PRUNED_DIRS = frozenset([".git", ".terraform", ".terragrunt-cache", ".tox",
+                         "node_modules", "vendor"])
+_READ_SIZE = 1 << 16
+
+
+def find_files(directory: Union[str, Path], extensions: Iterable[str],
+               recursive: bool = True) -> Iterator[Path]:
+    """Yield the files under directory whose suffix is in extensions.
+
+    Without recursive only the files directly in directory are yielded.
+    """
+    extensions = frozenset(extensions)
+    if not recursive:
+        yield from _scandir_files(str(directory), extensions, False)
+        return
+    found = False
+    try:
+        for fpath in _git_files(str(directory), extensions):
+            found = True
+            yield fpath
+    except subprocess.CalledProcessError:
+        # Not in a git work tree, or git failed before listing anything.
+        if found:
+            raise
+        yield from _scandir_files(str(directory), extensions, True)
+
+
+def _scandir_files(directory: str, extensions: frozenset,
+                   recursive: bool) -> Iterator[Path]:
+    stack = [directory]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if recursive and entry.name not in PRUNED_DIRS:
+                    stack.append(entry.path)
+            elif (os.path.splitext(entry.name)[1] in extensions
+                  and entry.is_file()):
+                yield Path(entry.path)
+
+
+def _git_files(directory: str, extensions: frozenset) -> Iterator[Path]:
+    command = ["git", "ls-files", "-z", "--cached", "--others",
+               "--exclude-standard"]
+    with instrument.timed("subprocess", "git ls-files"):
+        proc = subprocess.Popen(command, cwd=directory,
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL)
+        pending = previous = b""
+        try:
+            for block in iter(lambda: proc.stdout.read(_READ_SIZE), b""):
+                *names, pending = (pending + block).split(b"\0")
+                for name in names:
+                    # Conflicted files are listed once per stage.
+                    if name == previous:
+                        continue
+                    previous = name
+                    path = os.fsdecode(name)
+                    parts = path.split("/")
+                    if (os.path.splitext(parts[-1])[1] not in extensions
+                            or not PRUNED_DIRS.isdisjoint(parts[:-1])):
+                        continue
+                    path = os.path.join(directory, path)
+                    # Tracked files deleted from the working tree are
+                    # still listed.
+                    if os.path.isfile(path):
+                        yield Path(path)
+        finally:
+            proc.stdout.close()
+            returncode = proc.wait()
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, command)
@@ -1,6 +1,8 @@
 import os
 import sys
 import glob
+import shutil
+import tempfile
 import unittest
 
 if sys.version_info[0] < 3:
@@ -14,15 +16,20 @@ class TestCheckSkipEnv(unittest.TestCase):
         self.root = get_git_root()
         self.hook_script = os.path.join(self.root, 'hooks', 'check_skip_env.py')
         self.fixture_dir = os.path.join(self.root, 'test', 'fixtures')
+        # Keep the result cache out of the user's cache directory, and start every test without cached verdicts.
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.env = dict(os.environ, XDG_CACHE_HOME=cache_dir)
 
-    def _check_success(self, files):
-        subprocess.run([self.hook_script] + files, check=True)
+    def _check_success(self, files, args=None):
+        subprocess.run([self.hook_script] + (args or []) + files, env=self.env, check=True)
 
-    def _check_failure(self, files, failed_files):
-        result = subprocess.run([self.hook_script] + files, stderr=subprocess.PIPE)
+    def _check_failure(self, files, failed_files, args=None):
+        result = subprocess.run([self.hook_script] + (args or []) + files, env=self.env, stderr=subprocess.PIPE)
         self.assertEqual(result.returncode, 1)
         for f in failed_files:
             self.assertIn(f, result.stderr.decode('utf-8'))
+        return result.stderr.decode('utf-8')
 
     def test_everything_commented(self):
         self._check_success([os.path.join(self.fixture_dir, 'everything_commented_test.go')])
@@ -46,16 +53,101 @@ class TestCheckSkipEnv(unittest.TestCase):
         test_file_path = os.path.join(self.fixture_dir, 'nested_uncommented_test.go')
         self._check_failure([test_file_path], [test_file_path])
 
+    def test_block_comments_and_strings(self):
+        self._check_success([os.path.join(self.fixture_dir, 'block_commented_test.go')], ['--no-cache'])
+
+    def test_inline_uncommented(self):
+        test_file_path = os.path.join(self.fixture_dir, 'inline_uncommented_test.go')
+        stderr = self._check_failure([test_file_path], [test_file_path], ['--no-cache'])
+        self.assertIn('{}:13: os.Setenv("SKIP_deploy")'.format(test_file_path), stderr)
+
     def test_everything(self):
         all_test_files = glob.glob(os.path.join(self.fixture_dir, '*.go'))
         failed_files = [
             os.path.join(self.fixture_dir, 'skip_uncommented_test.go'),
+            os.path.join(self.fixture_dir, 'inline_uncommented_test.go'),
             os.path.join(self.fixture_dir, 'multiple_skip_uncommented_test.go'),
             os.path.join(self.fixture_dir, 'nested_uncommented_test.go'),
             os.path.join(self.fixture_dir, 'terratest_region_uncommented_test.go'),
         ]
         self._check_failure(all_test_files, failed_files)
 
+    def test_every_call_reported_with_line(self):
+        test_file_path = os.path.join(self.fixture_dir, 'multiple_skip_uncommented_test.go')
+        stderr = self._check_failure([test_file_path], [test_file_path], ['--no-cache'])
+        self.assertIn('{}:17: os.Setenv("SKIP_deploy")'.format(test_file_path), stderr)
+        self.assertIn('{}:18: os.Setenv("SKIP_validate")'.format(test_file_path), stderr)
+
+    def test_forbidden_keys_from_pyproject(self):
+        args = ['--toml', os.path.join(self.fixture_dir, 'pyproject.toml.skip_env')]
+        self._check_success([os.path.join(self.fixture_dir, 'skip_uncommented_test.go')], args)
+        test_file_path = os.path.join(self.fixture_dir, 'terratest_region_uncommented_test.go')
+        self._check_failure([test_file_path], [test_file_path], args)
+
+    def test_invalid_forbidden_keys(self):
+        test_file_path = os.path.join(self.fixture_dir, 'non_skip_uncommented_test.go')
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        toml_path = os.path.join(directory, 'pyproject.toml')
+        for value in ['"SKIP_"', '7', '[1, 2]', '[""]']:
+            with open(toml_path, 'w') as f:
+                f.write('[tool.check_skip_env]\nforbidden_keys = {}\n'.format(value))
+            stderr = self._check_failure([test_file_path], [], ['--toml', toml_path])
+            self.assertIn('forbidden_keys must be a list of non-empty strings', stderr)
+            self.assertNotIn('Traceback', stderr)
+
+    def test_everything_in_parallel(self):
+        all_test_files = sorted(glob.glob(os.path.join(self.fixture_dir, '*.go')))
+        failed_files = [
+            os.path.join(self.fixture_dir, 'inline_uncommented_test.go'),
+            os.path.join(self.fixture_dir, 'multiple_skip_uncommented_test.go'),
+            os.path.join(self.fixture_dir, 'nested_uncommented_test.go'),
+            os.path.join(self.fixture_dir, 'skip_uncommented_test.go'),
+            os.path.join(self.fixture_dir, 'terratest_region_uncommented_test.go'),
+        ]
+        stderr = self._check_failure(all_test_files, failed_files, ['--jobs', '3', '--no-cache'])
+        positions = [stderr.index(f) for f in failed_files]
+        self.assertEqual(positions, sorted(positions))
+
+    def test_diff_only(self):
+        repo = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, repo)
+        git = ['git', '-c', 'user.name=t', '-c', 'user.email=t@e']
+        subprocess.run(git + ['init', '-q'], cwd=repo, check=True)
+        test_file = os.path.join(repo, 'legacy_test.go')
+        with open(os.path.join(self.fixture_dir, 'skip_uncommented_test.go')) as f:
+            legacy = f.read()
+        with open(test_file, 'w') as f:
+            f.write(legacy)
+        subprocess.run(git + ['add', '.'], cwd=repo, check=True)
+        subprocess.run(git + ['commit', '-q', '-m', 'legacy'], cwd=repo, check=True)
+        with open(test_file, 'a') as f:
+            f.write('\n// os.Setenv("SKIP_commented", "true")\n')
+        subprocess.run(git + ['add', '.'], cwd=repo, check=True)
+        result = subprocess.run([self.hook_script, '--diff-only', 'legacy_test.go'], cwd=repo, env=self.env)
+        self.assertEqual(result.returncode, 0)
+        with open(test_file, 'a') as f:
+            f.write('func TestAdded(t *testing.T) {\n\tos.Setenv("SKIP_added", "true")\n}\n')
+        subprocess.run(git + ['add', '.'], cwd=repo, check=True)
+        result = subprocess.run([self.hook_script, '--diff-only', 'legacy_test.go'], cwd=repo, env=self.env,
+                                stderr=subprocess.PIPE)
+        self.assertEqual(result.returncode, 1)
+        stderr = result.stderr.decode('utf-8')
+        self.assertIn('legacy_test.go:{}: os.Setenv("SKIP_added")'.format(legacy.count('\n') + 4), stderr)
+        self.assertEqual(stderr.count('os.Setenv('), 1)
+
+    def test_diff_only_outside_repository(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        env = dict(self.env, GIT_CEILING_DIRECTORIES=directory)
+        test_file_path = os.path.join(self.fixture_dir, 'skip_uncommented_test.go')
+        result = subprocess.run([self.hook_script, '--diff-only', test_file_path], cwd=directory, env=env,
+                                stderr=subprocess.PIPE)
+        self.assertEqual(result.returncode, 1)
+        stderr = result.stderr.decode('utf-8')
+        self.assertIn('checking whole files', stderr)
+        self.assertIn(test_file_path, stderr)
+
 
 def get_git_root():
     """ Returns the root directory of the git repository, assuming this script is run from within the repository. """
@@ -175,6 +175,40 @@ BREAKING CHANGE:
 
         self._check_failure(self.project_dir, os.path.join(self.fixture_dir, 'pyproject.toml.default'))
 
+    def _make_history(self, messages):
+        env = dict(os.environ, GIT_AUTHOR_NAME='pytest', GIT_AUTHOR_EMAIL='pytest@example.com',
+                   GIT_COMMITTER_NAME='pytest', GIT_COMMITTER_EMAIL='pytest@example.com')
+        subprocess.run(['git', 'init', '-q', self.project_dir], check=True)
+        for message in messages:
+            subprocess.run(['git', 'commit', '-q', '--allow-empty', '--no-verify', '-m', message],
+                           cwd=self.project_dir, env=env, check=True)
+
+    def _check_range(self, rev_range):
+        return subprocess.run([self.hook_script, "--project_dir", self.project_dir, "--range", rev_range,
+                               "--toml", os.path.join(self.fixture_dir, 'pyproject.toml.default')],
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE, encoding='utf-8')
+
+    def test_valid_commit_range(self):
+        self._make_history(["not conventional", "build(ci): first", "fix(hooks)!: second\n\nBREAKING CHANGE: removed"])
+        result = self._check_range("HEAD~2..HEAD")
+        self.assertEqual(result.returncode, 0, result.stdout)
+
+    def test_invalid_commit_range(self):
+        self._make_history(["build(ci): first", "Fix things", "fix(hooks)!: second", "feat(ui): third", "docs: fourth"])
+        result = self._check_range("HEAD~4..HEAD")
+        self.assertEqual(result.returncode, 1)
+        failures = [line.split(' ', 1)[1] for line in result.stdout.splitlines()[:3]]
+        self.assertEqual(failures, ["docs: fourth: missing type(scope)",
+                                    "fix(hooks)!: second: '!' without a BREAKING CHANGE: footer",
+                                    "Fix things: missing type(scope)"])
+        self.assertIn("3 of 4 commit messages in HEAD~4..HEAD", result.stdout)
+
+    def test_unknown_commit_range(self):
+        self._make_history(["build(ci): first"])
+        result = self._check_range("missing..HEAD")
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("git log missing..HEAD failed", result.stderr)
+
 
 def write_commit_message(commit_msg: str, git_dir: str) -> None:
     with open(f"{git_dir}/COMMIT_EDITMSG", 'w') as _:
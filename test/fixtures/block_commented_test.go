@@ -0,0 +1,30 @@
+package basecase
+
+import (
+	"testing"
+
+	"github.com/gruntwork-io/terratest/modules/logger"
+	test_structure "github.com/gruntwork-io/terratest/modules/test-structure"
+)
+
+const usage = `Uncomment the items below to skip certain parts of the test:
+	os.Setenv("SKIP_deploy", "true")
+`
+
+func TestWithStages(t *testing.T) {
+	t.Parallel()
+
+	/* Uncomment the items below to skip certain parts of the test
+	os.Setenv("TERRATEST_REGION", "eu-west-1")
+	os.Setenv("SKIP_setup", "true")
+	*/
+	logger.Logf(t, "To skip cleanup run: os.Setenv(\"SKIP_cleanup\", \"true\")")
+
+	test_structure.RunTestStage(t, "setup", func() {
+		logger.Logf(t, "setup")
+	})
+
+	defer test_structure.RunTestStage(t, "cleanup", func() {
+		logger.Logf(t, "cleanup")
+	})
+}
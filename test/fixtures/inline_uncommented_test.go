@@ -0,0 +1,16 @@
+package basecase
+
+import (
+	"os"
+	"testing"
+
+	test_structure "github.com/gruntwork-io/terratest/modules/test-structure"
+)
+
+func TestWithStages(t *testing.T) {
+	t.Parallel()
+
+	/* deploy once */ os.Setenv("SKIP_deploy", "true")
+
+	test_structure.RunTestStage(t, "deploy", func() {})
+}
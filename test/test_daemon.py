@@ -0,0 +1,91 @@
+"""Test running the Python hooks through the daemon client."""
+
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from hooks import daemon
+
+HOOKS = Path(__file__).resolve().parent.parent / "hooks"
+
+
+def _run(args: List[str], cwd: Path, env: Dict[str, str]
+         ) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, str(HOOKS / "daemon.py")] + args,
+                          cwd=cwd, env=env, encoding="utf-8",
+                          stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+
+
+def _repo(tmp_path: Path) -> None:
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    (tmp_path / "ok.py").write_text("x = 1\n")
+    (tmp_path / "bad.py").write_text("x = '\u2066'\n", encoding="utf-8")
+
+
+def test_hook_entries() -> None:
+    """Test that every daemon entry of the hooks config is a served hook."""
+    config = (HOOKS.parent / ".pre-commit-hooks.yaml").read_text()
+    entries = re.findall(r"^\s*entry: hooks/daemon\.py (\S+)$", config,
+                         re.MULTILINE)
+    assert sorted(entries) == sorted(daemon.HOOKS)
+
+
+def test_in_process(tmp_path: Path) -> None:
+    """Test that hooks run in the client without PRECOMMIT_DAEMON."""
+    _repo(tmp_path)
+    env = dict(os.environ)
+    env.pop(daemon.ENV_VAR, None)
+    assert _run(["PEP-672", "--no-cache", "ok.py"], tmp_path,
+                env).returncode == 0
+    failed = _run(["PEP-672", "--no-cache", "bad.py"], tmp_path, env)
+    assert failed.returncode == 1
+    assert "bad.py: line 1, column 6" in failed.stdout
+    assert not list((tmp_path / ".git").glob("*.sock"))
+
+
+def test_server(tmp_path: Path) -> None:
+    """Test that the server starts, streams results and exits when idle."""
+    _repo(tmp_path)
+    env = dict(os.environ, **{daemon.ENV_VAR: "1",
+                              daemon.IDLE_ENV_VAR: "2"})
+    passed = _run(["PEP-672", "--no-cache", "ok.py"], tmp_path, env)
+    assert passed.returncode == 0, passed.stdout
+    assert "Scanned 1 files." in passed.stdout
+    sockets = list((tmp_path / ".git").glob("*.sock"))
+    assert len(sockets) == 1
+    failed = _run(["PEP-672", "--no-cache", "ok.py", "bad.py"], tmp_path,
+                  env)
+    assert failed.returncode == 1
+    assert "bad.py: line 1, column 6" in failed.stdout
+    # The hook sees the working directory of the client.
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "bad.py").write_text("y = 1\n")
+    assert _run(["PEP-672", "--no-cache", "bad.py"], tmp_path / "sub",
+                env).returncode == 0
+    deadline = time.monotonic() + 10
+    while sockets[0].exists() and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert not sockets[0].exists()
+
+
+def test_without_unix_sockets(tmp_path: Path) -> None:
+    """Test that hooks run in process where fcntl and AF_UNIX are missing."""
+    _repo(tmp_path)
+    script = ("import runpy, socket, sys\n"
+              "sys.modules['fcntl'] = None\n"
+              "del socket.AF_UNIX\n"
+              f"sys.path.insert(0, {str(HOOKS)!r})\n"
+              f"sys.argv = [{str(HOOKS / 'daemon.py')!r}] + sys.argv[1:]\n"
+              "runpy.run_path(sys.argv[0], run_name='__main__')\n")
+    env = dict(os.environ, PRECOMMIT_DAEMON="1")
+    failed = subprocess.run(
+        [sys.executable, "-c", script, "PEP-672", "--no-cache", "bad.py"],
+        cwd=tmp_path, env=env, encoding="utf-8", stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT)
+    assert failed.returncode == 1
+    assert "BIDI" in failed.stdout
+    assert not list((tmp_path / ".git").glob("*.sock"))
@@ -64,3 +64,63 @@ def test_non_forbidden_files(tmp_path: Path) -> None:
                                                     tmp_path)
     assert(forbidden_files.protect_files(forbidden_list,
                                          tmp_path) == None)
+
+
+def test_protected_paths() -> None:
+    """Test exact, directory and glob entries."""
+    protected = forbidden_files.ProtectedPaths(
+        ["go.sum", "generated/", "deploy/*.lock", "charts/*/Chart.lock"])
+    assert protected.match("go.sum")
+    assert not protected.match("sub/go.sum")
+    assert protected.match("generated/a.py")
+    assert protected.match("generated/deep/b.py")
+    assert not protected.match("generated.py")
+    assert not protected.match("not/generated/a.py")
+    assert protected.match("deploy/app.lock")
+    assert protected.match("charts/web/Chart.lock")
+    assert not protected.match("charts/web/Chart.yaml")
+
+
+def test_bracketed_file_names(tmp_path: Path) -> None:
+    """Test that entries naming existing files are not used as globs."""
+    protected = forbidden_files.ProtectedPaths(["pages/[id].js"])
+    assert protected.match("pages/[id].js")
+    assert protected.match("pages/i.js")
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    (tmp_path / "pages").mkdir()
+    for name in ["[id].js", "i.js"]:
+        (tmp_path / "pages" / name).write_text("edited\n")
+    subprocess.run(["git", "add", "-A"], cwd=tmp_path, check=True)
+    with pytest.raises(PermissionError) as error:
+        forbidden_files.protect_files(["pages/[id].js"], tmp_path)
+    assert str(error.value).splitlines()[1:-1] == ["  pages/[id].js"]
+
+
+def test_get_file_list(tmp_path: Path) -> None:
+    """Test that entries are made relative to the working directory."""
+    (tmp_path / "config").mkdir()
+    protected_list = tmp_path / "config" / "protected.txt"
+    protected_list.write_text("# Comment\n\nlocal.txt\nout/\n*.lock\n")
+    assert forbidden_files._get_file_list(
+        protected_list, ["top.txt"], tmp_path) == [
+            "config/*.lock", "config/local.txt", "config/out/", "top.txt"]
+
+
+def test_all_violations(tmp_path: Path) -> None:
+    """Test that every staged protected file is reported, renames too."""
+    subprocess.run(["git", "init"], cwd=tmp_path, check=True)
+    for name in ["keep.txt", "old.lock", "gen/a.py", "gen/b.py"]:
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_text(f"{name}\n")
+    _git_add_commit("test_all_violations", tmp_path)
+
+    (tmp_path / "gen" / "a.py").write_text("edited\n")
+    (tmp_path / "gen" / "b.py").write_text("edited\n")
+    (tmp_path / "old.lock").rename(tmp_path / "new.txt")
+    (tmp_path / "keep.txt").write_text("edited\n")
+    subprocess.run(["git", "add", "-A"], cwd=tmp_path, check=True)
+
+    with pytest.raises(PermissionError) as error:
+        forbidden_files.protect_files(["gen/", "*.lock"], tmp_path)
+    assert str(error.value).splitlines()[1:4] == [
+        "  gen/a.py", "  gen/b.py", "  old.lock"]
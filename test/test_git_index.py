@@ -0,0 +1,114 @@
+"""Test reading staged contents from the git index."""
+
+from pathlib import Path
+import subprocess
+
+import pytest
+
+from hooks import check_pep672_ascii, git_index
+
+
+def _git(tmp_path: Path, *args: str) -> str:
+    return subprocess.run(["git"] + list(args), cwd=tmp_path, check=True,
+                          encoding="utf-8", capture_output=True).stdout
+
+
+def test_staged_blobs_and_contents(tmp_path: Path) -> None:
+    """Test that staged blobs are found and read, not the working tree."""
+    _git(tmp_path, "init")
+    staged = tmp_path / "staged.txt"
+    staged.write_text("staged\n")
+    big = tmp_path / "big.txt"
+    big.write_bytes(b"x" * 100000)
+    _git(tmp_path, "add", "staged.txt", "big.txt")
+    staged.write_text("edited after staging\n")
+    (tmp_path / "untracked.txt").write_text("untracked\n")
+
+    blobs = git_index.staged_blobs(["staged.txt", "big.txt",
+                                    "untracked.txt"], cwd=tmp_path)
+    assert set(blobs) == {"staged.txt", "big.txt"}
+    assert blobs["staged.txt"] == _git(tmp_path, "rev-parse",
+                                       ":staged.txt").strip()
+    with git_index.BlobReader(cwd=tmp_path) as reader:
+        # Abandoning a stream half way must not corrupt the next read.
+        chunks = reader.stream(blobs["big.txt"], 1000)
+        assert next(chunks) == b"x" * 1000
+        chunks.close()
+        assert reader.read(blobs["staged.txt"]) == b"staged\n"
+        with pytest.raises(KeyError):
+            reader.read("0" * 40)
+
+
+def test_staged_blobs_outside_repository(tmp_path: Path) -> None:
+    """Test that paths outside a git repository are not found."""
+    (tmp_path / "file.txt").write_text("hello\n")
+    assert git_index.staged_blobs(["file.txt"], cwd=tmp_path) == {}
+
+
+def test_pep672_checks_staged_content(tmp_path: Path, monkeypatch) -> None:
+    """Test that the staged content is checked, not the working tree."""
+    _git(tmp_path, "init")
+    source = tmp_path / "source.py"
+    source.write_text(u"x = '\u00e9'\n", encoding="utf-8")
+    _git(tmp_path, "add", "source.py")
+    source.write_text("x = 'e'\n")
+    monkeypatch.chdir(tmp_path)
+    check_pep672_ascii.scan_files([Path("source.py")], False, False, [".py"])
+    with pytest.raises(UnicodeError):
+        check_pep672_ascii.scan_files([Path("source.py")], False, False,
+                                      [".py"], from_index=True)
+
+
+def test_staged_hunks(tmp_path: Path) -> None:
+    """Test that only the lines added by staged changes are returned."""
+    _git(tmp_path, "init")
+    (tmp_path / "edited.txt").write_text("a\nb\nc\nd\n")
+    (tmp_path / "deleted.txt").write_text("gone\n")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "-c", "user.name=t", "-c", "user.email=t@e", "commit",
+         "-m", "initial")
+    # An added line looking like a diff header must not end the hunk.
+    (tmp_path / "edited.txt").write_text("a\nB\n++ x\nc\nd\nnew\n")
+    (tmp_path / "with space.txt").write_text("one\ntwo\n")
+    _git(tmp_path, "rm", "-q", "deleted.txt")
+    _git(tmp_path, "add", ".")
+    (tmp_path / "edited.txt").write_text("unstaged\n")
+
+    hunks = git_index.staged_hunks(
+        ["edited.txt", "with space.txt", "deleted.txt", "missing.txt"],
+        cwd=tmp_path)
+    assert hunks == {"edited.txt": [(2, b"B\n++ x\n"), (6, b"new\n")],
+                     "with space.txt": [(1, b"one\ntwo\n")]}
+
+
+def test_staged_hunks_outside_repository(tmp_path: Path,
+                                         monkeypatch) -> None:
+    """Test that a failing diff falls back to checking whole files."""
+    monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path))
+    (tmp_path / "source.py").write_text(u"x = '\u00e9'\n", encoding="utf-8")
+    assert git_index.staged_hunks(["source.py"], cwd=tmp_path) is None
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(UnicodeError):
+        check_pep672_ascii.scan_files([Path("source.py")], False, False,
+                                      [".py"], diff_only=True)
+
+
+def test_pep672_diff_only(tmp_path: Path, monkeypatch) -> None:
+    """Test that committed violations are ignored and added ones located."""
+    _git(tmp_path, "init")
+    source = tmp_path / "source.py"
+    source.write_text(u"x = '\u00e9'\ny = 1\n", encoding="utf-8")
+    _git(tmp_path, "add", "source.py")
+    _git(tmp_path, "-c", "user.name=t", "-c", "user.email=t@e", "commit",
+         "-m", "initial")
+    monkeypatch.chdir(tmp_path)
+    source.write_text(u"x = '\u00e9'\ny = 2\nz = 3\n", encoding="utf-8")
+    _git(tmp_path, "add", "source.py")
+    check_pep672_ascii.scan_files([Path("source.py")], False, False, [".py"],
+                                  diff_only=True)
+    source.write_text(u"x = '\u00e9'\ny = 2\nz = '\u2066'\n",
+                      encoding="utf-8")
+    _git(tmp_path, "add", "source.py")
+    with pytest.raises(UnicodeError, match="line 3, column 6\nBIDI"):
+        check_pep672_ascii.scan_files([Path("source.py")], False, False,
+                                      [".py"], diff_only=True)
@@ -0,0 +1,36 @@
+"""Test the golangci-lint hook with a fake golangci-lint."""
+
+import subprocess
+from pathlib import Path
+
+from test.tool_stubs import calls, make_stub, stub_env
+
+HOOK = Path(__file__).resolve().parent.parent / "hooks" / "golangci-lint.sh"
+LINT_STUB = """
+print("cache: " + os.environ.get("GOLANGCI_LINT_CACHE", ""))
+sys.exit(1 if "./bad" in args else 0)
+"""
+
+
+def test_one_run_per_module(tmp_path: Path) -> None:
+    """Test that each Go module is linted once over its changed packages."""
+    bin_dir = tmp_path / "bin"
+    make_stub(bin_dir, "golangci-lint", LINT_STUB)
+    repo = tmp_path / "repo"
+    files = ["main.go", "pkg/a.go", "pkg/b.go", "tools/gen/go.mod",
+             "tools/gen/main.go", "tools/gen/bad/x.go", "pkg/a_test.go"]
+    for name in files + ["go.mod"]:
+        (repo / name).parent.mkdir(parents=True, exist_ok=True)
+        (repo / name).write_text("")
+    env = stub_env(bin_dir)
+    env["XDG_CACHE_HOME"] = str(tmp_path / "cache")
+    env.pop("GOLANGCI_LINT_CACHE", None)
+    proc = subprocess.run([str(HOOK), "--persistent-cache"] + files,
+                          cwd=repo, env=env, capture_output=True)
+    assert proc.returncode == 1
+    assert f"cache: {tmp_path / 'cache'}" in proc.stdout.decode()
+    assert sorted(calls(bin_dir, "golangci-lint")) == [
+        [str(repo), "run", "--new-from-rev", "HEAD", "./.", "./pkg"],
+        [str(repo / "tools" / "gen"), "run", "--new-from-rev", "HEAD",
+         "./.", "./bad"],
+    ]
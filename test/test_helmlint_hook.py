@@ -0,0 +1,32 @@
+"""Test the helmlint hook with a fake helm."""
+
+import subprocess
+from pathlib import Path
+
+from test.tool_stubs import calls, make_stub, stub_env
+
+HOOK = Path(__file__).resolve().parent.parent / "hooks" / "helmlint.sh"
+
+
+def test_lint_each_chart_once(tmp_path: Path) -> None:
+    """Test that every chart is linted once, with its linter values."""
+    bin_dir = tmp_path / "bin"
+    make_stub(bin_dir, "helm", 'sys.exit(1 if args[-1].endswith("b") else 0)')
+    repo = tmp_path / "repo"
+    files = ["charts/a/templates/deployment.yaml",
+             "charts/a/templates/_helpers.tpl", "charts/b/Chart.yaml",
+             "charts/a/values.yaml", "charts/b/templates/nested/svc.yaml",
+             "config/settings.yaml"]
+    for name in files + ["charts/a/Chart.yaml", "charts/a/linter_values.yaml"]:
+        (repo / name).parent.mkdir(parents=True, exist_ok=True)
+        (repo / name).write_text("")
+    proc = subprocess.run([str(HOOK)] + files, cwd=repo,
+                          env=stub_env(bin_dir))
+    assert proc.returncode == 1
+    chart_a = "charts/a"
+    chart_b = "charts/b"
+    assert sorted(call[1:] for call in calls(bin_dir, "helm")) == [
+        ["lint", "-f", f"{chart_a}/values.yaml",
+         "-f", f"{chart_a}/linter_values.yaml", chart_a],
+        ["lint", chart_b],
+    ]
@@ -0,0 +1,58 @@
+"""Test the PRECOMMIT_PROFILE records and their report."""
+
+import io
+from pathlib import Path
+
+import pytest
+
+from hooks import check_pep672_ascii, instrument, profile_report, runner
+
+
+def test_disabled(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that nothing is recorded without the variable."""
+    monkeypatch.delenv(instrument.ENV_VAR, raising=False)
+    with instrument.hook_run("hook") as stats:
+        stats["files"] = 1
+    assert not instrument.enabled()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_records(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test hook, file and subprocess records of a profiled run."""
+    profile = tmp_path / "profile.jsonl"
+    monkeypatch.setenv(instrument.ENV_VAR, str(profile))
+    source = tmp_path / "a.py"
+    source.write_text("hello\n")
+    with instrument.hook_run("PEP-672"):
+        check_pep672_ascii.scan_files([source], False, False, [".py"])
+        runner.run_command(["true"])
+    records = profile_report.read_records(str(profile))
+    assert [(r["kind"], r["hook"]) for r in records] == [
+        ("file", "PEP-672"), ("subprocess", "PEP-672"), ("hook", "PEP-672")]
+    assert records[0]["name"] == str(source)
+    assert records[0]["bytes"] == 6
+    assert records[1]["name"] == "true"
+    assert all(r["seconds"] >= 0 for r in records)
+
+
+def test_report(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the report ranks hooks, files and subprocesses."""
+    profile = tmp_path / "profile.jsonl"
+    monkeypatch.setenv(instrument.ENV_VAR, str(profile))
+    for kind, name, seconds, fields in [
+            ("hook", "fast", 0.1, {"cache_hits": 1, "cache_misses": 1}),
+            ("hook", "slow", 2.0, {}), ("hook", "slow", 1.0, {}),
+            ("file", "small.py", 0.01, {"bytes": 10}),
+            ("file", "big.py", 0.5, {"bytes": 5000}),
+            ("subprocess", "git ls-files", 0.2, {})]:
+        instrument.record(kind, name, seconds, **fields)
+    with open(profile, "a") as f:
+        f.write("not json\n")
+    out = io.StringIO()
+    profile_report.report(profile_report.read_records(str(profile)), 10, out)
+    lines = out.getvalue().splitlines()
+    assert lines[1].split() == ["slow", "2", "3.000", "1.500", "2.000", "-"]
+    assert lines[2].split() == ["fast", "1", "0.100", "0.100", "0.100", "1/2"]
+    assert lines[5].split()[0] == "big.py"
+    assert lines[6].split()[0] == "small.py"
+    assert lines[-1].split()[:3] == ["git", "ls-files", "1"]
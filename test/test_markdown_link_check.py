@@ -0,0 +1,113 @@
+"""Test the markdown link checker against a local HTTP server."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from hooks import markdown_link_check, result_cache
+
+
+class _Handler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_HEAD(self) -> None:
+        self.requests.append(self.path)
+        self.send_response(200 if self.path.startswith("/ok") else 404)
+        self.end_headers()
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def server():
+    """Serve 200 for paths starting with /ok and 404 otherwise."""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    _Handler.requests = []
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_extract_links() -> None:
+    """Test that links in code are skipped and references are found."""
+    text = """[a](one.md) ![img](img.png "title") `[b](code.md)`
+```
+[c](fenced.md)
+```
+[ref]: <two.md>
+[^1]: A footnote.
+See <https://example.com/x>.
+"""
+    assert markdown_link_check.extract_links(text) == [
+        (1, "one.md"), (1, "img.png"), (5, "two.md"),
+        (7, "https://example.com/x")]
+
+
+def test_extract_links_with_parentheses() -> None:
+    """Test that balanced parentheses are part of the destination."""
+    text = ("[w](https://en.wikipedia.org/wiki/Foo_(bar)) "
+            "[t](docs/a_(b).md \"title\")\n(see [c](c.md))\n")
+    assert markdown_link_check.extract_links(text) == [
+        (1, "https://en.wikipedia.org/wiki/Foo_(bar)"),
+        (1, "docs/a_(b).md"), (2, "c.md")]
+
+
+def test_extract_badge_and_nested_links() -> None:
+    """Test badge links, nested link text and angle-bracket destinations."""
+    text = ("[![Build](https://img.shields.io/x.svg)](missing-dir/nothing.md)"
+            "\n[a [b]](x.md) [c](<path with space.md> 'title') \\[d](no.md)\n")
+    assert markdown_link_check.extract_links(text) == [
+        (1, "missing-dir/nothing.md"), (1, "https://img.shields.io/x.svg"),
+        (2, "x.md"), (2, "path with space.md")]
+
+
+def test_protocol_relative_link() -> None:
+    """Test that //host/path links are URLs, not repository paths."""
+    assert markdown_link_check.local_target(
+        "//example.com/x", Path("README.md")) is None
+
+
+def test_dead_links(tmp_path: Path, server: str,
+                    monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test local and external links, each URL requested once."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "guide.md").write_text("# Guide\n")
+    (tmp_path / "README.md").write_text(f"""[guide](docs/guide.md#setup)
+[root](/docs/guide.md) [self](#top) [file](file://{tmp_path}/README.md)
+[ok]({server}/ok) [missing](docs/missing.md) [gone]({server}/gone)
+[paren]({server}/ok_(x)) [relative]({server[len("http:"):]}/ok)
+[![badge]({server}/ok)](missing-dir/nothing.md)
+""")
+    (tmp_path / "docs" / "other.md").write_text(
+        f"[up](../README.md) [ok]({server}/ok)\n")
+    errors = markdown_link_check.check_files(
+        [Path("README.md"), Path("docs/other.md")])
+    assert errors[:2] == [
+        "README.md:3: [x] docs/missing.md -> Not found",
+        f"README.md:3: [x] {server}/gone -> Status: 404",
+    ]
+    # Protocol-relative links are requested over https, which the test
+    # server does not speak.
+    relative = server.replace("http:", "")
+    assert errors[2].startswith(f"README.md:4: [x] {relative}/ok -> Error:")
+    assert errors[3:] == [
+        "README.md:5: [x] missing-dir/nothing.md -> Not found"]
+    assert sorted(_Handler.requests) == ["/gone", "/ok", "/ok_(x)"]
+
+
+def test_url_cache_ttl(tmp_path: Path, server: str) -> None:
+    """Test that working URLs are not requested again until they expire."""
+    md = tmp_path / "README.md"
+    md.write_text(f"[ok]({server}/ok)\n")
+    db = tmp_path / "cache.sqlite3"
+    for ttl, requests in [(3600, 1), (3600, 1), (0, 2)]:
+        with result_cache.ResultCache("test", 1, path=db) as cache:
+            assert markdown_link_check.check_files([md], ttl=ttl,
+                                                   cache=cache) == []
+        assert len(_Handler.requests) == requests
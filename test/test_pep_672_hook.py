@@ -1,6 +1,7 @@
 """Test PEP-672 checker."""
 
 from pathlib import Path
+import tracemalloc
 
 import pytest
 
@@ -23,3 +24,102 @@ def test_compliant_file(tmp_path: Path) -> None:
         f.write("hello")
     assert(check_pep672_ascii.scan_files(
         [tmpfile], False, False, [".py"]) == None)
+
+
+def test_violation_position(tmp_path: Path) -> None:
+    """Test that errors report the line and character column."""
+    tmpfile = tmp_path / "homoglyph.py"
+    with open(tmpfile, "w", encoding="utf-8") as f:
+        f.write("a = 1\nb = \"ééа\"\n")
+    with pytest.raises(UnicodeError, match="line 2, column 6"):
+        check_pep672_ascii.scan_files([tmpfile], False, False, [".py"])
+
+
+def test_suppressed_file(tmp_path: Path, caplog) -> None:
+    """Test that suppression only warns on non-BIDI characters."""
+    tmpfile = tmp_path / "suppressed.py"
+    with open(tmpfile, "w", encoding="utf-8") as f:
+        f.write("# café\nx = 1  # naïve\n")
+    check_pep672_ascii.scan_files([tmpfile], False, True, [".py"])
+    warnings = [r.getMessage() for r in caplog.records
+                if r.levelname == "WARNING"]
+    assert len(warnings) == 2
+    assert "line 1, column 6" in warnings[0]
+    assert "line 2, column 12" in warnings[1]
+
+
+def test_non_utf8_file(tmp_path: Path) -> None:
+    """Test that files which are not UTF-8 text are skipped."""
+    tmpfile = tmp_path / "binary.py"
+    with open(tmpfile, "wb") as f:
+        f.write(b"\xff\xfe\x00binary")
+    assert(check_pep672_ascii.scan_files(
+        [tmpfile], False, False, [".py"]) == None)
+
+
+def test_bidi_across_block_boundary(tmp_path: Path) -> None:
+    """Test a BIDI character split between two scanning blocks."""
+    tmpfile = tmp_path / "boundary.py"
+    prefix = b"#" * (check_pep672_ascii._BLOCK_SIZE - 1)
+    with open(tmpfile, "wb") as f:
+        f.write(prefix + u"\u202E".encode("utf-8") + b"\n")
+    with pytest.raises(UnicodeError, match="BIDI"):
+        check_pep672_ascii.scan_files([tmpfile], False, True, [".py"])
+
+
+def test_chunk_boundaries() -> None:
+    """Test that chunking the input does not change the reported positions."""
+    data = (u"caf\u00e9 \u65e5\u672c\n\u202E x \U0001F600\n" * 50
+            ).encode("utf-8")
+    whole = check_pep672_ascii._Scanner()
+    whole.feed(data, final=True)
+    chunked = check_pep672_ascii._Scanner()
+    for i in range(len(data)):
+        chunked.feed(data[i:i + 1])
+    chunked.feed(b"", final=True)
+    assert chunked.valid and whole.valid
+    assert len(whole.bidi) == 50
+    assert chunked.bidi == whole.bidi
+    assert chunked.non_ascii == whole.non_ascii
+
+
+def test_streaming_memory_is_flat(tmp_path: Path) -> None:
+    """Test that peak memory stays flat as the scanned file grows."""
+    peaks = []
+    for lines in (20000, 400000):
+        tmpfile = tmp_path / f"large_{lines}.py"
+        with open(tmpfile, "wb") as f:
+            f.write(b"x = 'ascii'\n" * lines)
+            f.write(u"y = '\u00e9'\n".encode("utf-8"))
+        tracemalloc.start()
+        check_pep672_ascii.scan_files([tmpfile], False, True, [".py"],
+                                      max_memory=256 * 1024)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    assert peaks[1] < 1024 * 1024
+    assert peaks[1] < 1.5 * peaks[0]
+
+
+def test_small_file_memory(tmp_path: Path) -> None:
+    """Test that small files do not allocate the whole memory budget."""
+    tmpfile = tmp_path / "small.py"
+    tmpfile.write_text("x = 1\n")
+    tracemalloc.start()
+    check_pep672_ascii.scan_files([tmpfile], False, False, [".py"])
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert peak < 1024 * 1024
+
+
+def test_parallel_scan_reports_all_files(tmp_path: Path) -> None:
+    """Test that a process pool reports every violation in a stable order."""
+    for i in range(12):
+        with open(tmp_path / f"file_{i:02}.py", "w", encoding="utf-8") as f:
+            f.write("ok = 1\n" if i % 3 else u"bad = '\u00e9'\n")
+    with pytest.raises(UnicodeError) as excinfo:
+        check_pep672_ascii.scan_files([tmp_path], False, False, [".py"],
+                                      jobs=3)
+    reported = [line.split(":")[0] for line in str(excinfo.value).splitlines()
+                if line.startswith(str(tmp_path))]
+    assert reported == [str(tmp_path / f"file_{i:02}.py")
+                        for i in (0, 3, 6, 9)]
@@ -0,0 +1,79 @@
+"""Test the result cache shared by the Python hooks."""
+
+from pathlib import Path
+import subprocess
+
+from hooks import check_pep672_ascii, result_cache
+
+
+def test_blob_sha_matches_git(tmp_path: Path) -> None:
+    """Test that content ids are the same as git blob SHAs."""
+    tmpfile = tmp_path / "file.txt"
+    with open(tmpfile, "wb") as f:
+        f.write(b"hello\x00world\n")
+    expected = subprocess.run(["git", "hash-object", str(tmpfile)],
+                              check=True, encoding="utf-8",
+                              capture_output=True).stdout.strip()
+    assert result_cache.blob_sha(tmpfile) == expected
+
+
+def test_verdicts_are_keyed_by_hook_and_options(tmp_path: Path) -> None:
+    """Test that verdicts persist and are isolated per configuration."""
+    db = tmp_path / "cache.sqlite3"
+    with result_cache.ResultCache("hook", 1, {"strict": True}, db) as cache:
+        assert cache.get("abc") is None
+        cache.put("abc", [[1, 2]])
+    with result_cache.ResultCache("hook", 1, {"strict": True}, db) as cache:
+        assert cache.get("abc") == [[1, 2]]
+        assert (cache.hits, cache.misses) == (1, 0)
+    for other in (("hook", 2, {"strict": True}),
+                  ("hook", 1, {"strict": False}),
+                  ("other-hook", 1, {"strict": True})):
+        with result_cache.ResultCache(*other, path=db) as cache:
+            assert cache.get("abc") is None
+
+
+def test_least_recently_used_eviction(tmp_path: Path) -> None:
+    """Test that the oldest entries are evicted beyond the size bound."""
+    db = tmp_path / "cache.sqlite3"
+    for content_id in ("a", "b", "c"):
+        with result_cache.ResultCache("hook", 1, path=db,
+                                      max_entries=2) as cache:
+            if content_id == "c":
+                assert cache.get("a") is True
+            cache.put(content_id, True)
+    with result_cache.ResultCache("hook", 1, path=db) as cache:
+        assert cache.get("a") is True
+        assert cache.get("b") is None
+        assert cache.get("c") is True
+
+
+def test_unavailable_cache(tmp_path: Path) -> None:
+    """Test that an unusable cache location degrades to always missing."""
+    blocker = tmp_path / "not_a_dir"
+    blocker.write_text("")
+    with result_cache.ResultCache("hook", 1,
+                                  path=blocker / "cache.sqlite3") as cache:
+        cache.put("abc", True)
+        assert cache.get("abc") is None
+
+
+def test_pep672_cache_hit_skips_scan(tmp_path: Path, monkeypatch) -> None:
+    """Test that cached files are not scanned again."""
+    tmpfile = tmp_path / "cached.py"
+    with open(tmpfile, "w") as f:
+        f.write("x = 1\n")
+    db = tmp_path / "cache.sqlite3"
+    with result_cache.ResultCache("PEP-672", 1, path=db) as cache:
+        check_pep672_ascii.scan_files([tmpfile], False, False, [".py"],
+                                      cache=cache)
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cached file was scanned")
+
+    monkeypatch.setattr(check_pep672_ascii, "_scan_file", fail)
+    with result_cache.ResultCache("PEP-672", 1, path=db) as cache:
+        check_pep672_ascii.scan_files([tmpfile], False, False, [".py"],
+                                      cache=cache)
+    assert (cache.hits, cache.misses) == (1, 0)
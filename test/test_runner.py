@@ -0,0 +1,185 @@
+"""Test the tool runner shared by the shell hooks."""
+
+import io
+import re
+import subprocess
+from pathlib import Path
+
+from hooks import runner
+from test.tool_stubs import calls, make_stub, stub_env
+
+HOOKS = Path(__file__).resolve().parent.parent / "hooks"
+# Fails like `terraform fmt -check` for files named unformatted*.
+FMT_STUB = """
+bad = [a for a in args if os.path.basename(a).startswith("unformatted")]
+for a in bad:
+    print(f"--- {a}")
+sys.exit(3 if bad else 0)
+"""
+
+
+def _tree(tmp_path: Path, files: list) -> list:
+    for name in files:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text("")
+    return files
+
+
+def test_run_tasks_order_and_status() -> None:
+    """Test that output follows task order and the worst status wins."""
+    tasks = [runner.Task(str(i), [["sh", "-c", f"sleep 0.{3 - i}; echo {i};"
+                                   f" exit {i}"]]) for i in range(3)]
+    out = io.BytesIO()
+    assert runner.run_tasks(tasks, jobs=3, out=out) == 2
+    assert out.getvalue() == b"0\n1\n2\n"
+
+
+def test_missing_tool() -> None:
+    """Test that a missing tool fails like in a shell."""
+    result = runner.run_task(runner.Task("x", [["no-such-tool-here"]]))
+    assert result.returncode == runner.NOT_FOUND
+    assert b"command not found" in result.output
+
+
+def test_terraform_fmt_one_call_per_directory(tmp_path: Path) -> None:
+    """Test that terraform fmt runs once per directory, not per file."""
+    bin_dir = tmp_path / "bin"
+    make_stub(bin_dir, "terraform", FMT_STUB)
+    files = _tree(tmp_path, ["a/main.tf", "a/vars.tf", "b/main.tf",
+                             "b/unformatted.tf", "a/outputs.tf"])
+    proc = subprocess.run([str(HOOKS / "terraform-fmt.sh")] + files,
+                          cwd=tmp_path, env=stub_env(bin_dir),
+                          capture_output=True)
+    assert proc.returncode == 3
+    assert proc.stdout == b"--- b/unformatted.tf\n"
+    assert sorted(call[1:] for call in calls(bin_dir, "terraform")) == [
+        ["fmt", "-diff", "-check", "a/main.tf", "a/vars.tf", "a/outputs.tf"],
+        ["fmt", "-diff", "-check", "b/main.tf", "b/unformatted.tf"],
+    ]
+
+
+def test_sentinel_fmt(tmp_path: Path) -> None:
+    """Test that sentinel fmt passes when every file is formatted."""
+    bin_dir = tmp_path / "bin"
+    make_stub(bin_dir, "sentinel", FMT_STUB)
+    files = _tree(tmp_path, ["p.sentinel", "q.sentinel"])
+    proc = subprocess.run([str(HOOKS / "sentinel-fmt.sh")] + files,
+                          cwd=tmp_path, env=stub_env(bin_dir))
+    assert proc.returncode == 0
+    assert calls(bin_dir, "sentinel") == [
+        [str(tmp_path), "fmt", "-diff", "-check", "p.sentinel", "q.sentinel"]]
+
+
+def test_go_hooks_one_call_per_package(tmp_path: Path) -> None:
+    """Test that the Go hooks run once per package, not once per file."""
+    bin_dir = tmp_path / "bin"
+    files = _tree(tmp_path, ["pkg/a.go", "pkg/b.go", "main.go",
+                             "pkg/a_test.go", "cmd/tool/main.go"])
+    expected = {
+        "gofmt": ("go", [["fmt", "./pkg"], ["fmt", "./."],
+                         ["fmt", "./cmd/tool"]]),
+        "goimports": ("goimports", [["-l", "-w", "./pkg"], ["-l", "-w", "./."],
+                                    ["-l", "-w", "./cmd/tool"]]),
+        "golint": ("golint", [["-set_exit_status", "./pkg"],
+                              ["-set_exit_status", "./."],
+                              ["-set_exit_status", "./cmd/tool"]]),
+    }
+    for hook, (tool, commands) in expected.items():
+        make_stub(bin_dir, tool)
+        proc = subprocess.run([str(HOOKS / f"{hook}.sh")] + files,
+                              cwd=tmp_path, env=stub_env(bin_dir))
+        assert proc.returncode == 0
+        assert sorted(call[1:] for call in calls(bin_dir, tool)) == sorted(
+            commands)
+        (bin_dir / f"{tool}.log").unlink()
+
+
+def test_terragrunt_hclfmt(tmp_path: Path) -> None:
+    """Test that fully changed directories are formatted by one process."""
+    bin_dir = tmp_path / "bin"
+    make_stub(bin_dir, "terragrunt")
+    files = _tree(tmp_path, ["live/prod/terragrunt.hcl", "live/env.hcl",
+                             "live/dev/terragrunt.hcl", "modules/a.hcl",
+                             "modules/b.hcl"])
+    _tree(tmp_path, ["modules/unchanged.hcl",
+                     "live/dev/.terragrunt-cache/x/terragrunt.hcl"])
+    proc = subprocess.run([str(HOOKS / "terragrunt-hclfmt.sh")] + files,
+                          cwd=tmp_path, env=stub_env(bin_dir))
+    assert proc.returncode == 0
+    assert sorted(calls(bin_dir, "terragrunt")) == [
+        [str(tmp_path), "hclfmt", "--terragrunt-working-dir", "live"],
+        [str(tmp_path / "modules"), "hclfmt", "--terragrunt-hclfmt-file",
+         "a.hcl"],
+        [str(tmp_path / "modules"), "hclfmt", "--terragrunt-hclfmt-file",
+         "b.hcl"],
+    ]
+
+
+def test_packer_validate(tmp_path: Path) -> None:
+    """Test that directories are validated once, output in order."""
+    bin_dir = tmp_path / "bin"
+    make_stub(bin_dir, "packer", 'sys.exit(1 if os.getcwd().endswith("b")'
+                                 ' else 0)')
+    files = _tree(tmp_path, ["b/x.pkr.hcl", "a/x.pkr.hcl", "b/y.pkr.hcl"])
+    proc = subprocess.run([str(HOOKS / "packer-validate.sh")] + files,
+                          cwd=tmp_path, env=stub_env(bin_dir),
+                          capture_output=True)
+    assert proc.returncode == 1
+    assert proc.stdout.decode().splitlines() == [
+        "--> Running 'packer validate -syntax-only' in directory 'b'",
+        "--> Running 'packer validate -syntax-only' in directory 'a'",
+    ]
+    assert sorted(calls(bin_dir, "packer")) == [
+        [str(tmp_path / "a"), "validate", "-syntax-only", "."],
+        [str(tmp_path / "b"), "validate", "-syntax-only", "."],
+    ]
+
+
+def test_groupers(tmp_path: Path, monkeypatch) -> None:
+    """Test grouping per file and per Helm chart."""
+    monkeypatch.chdir(tmp_path)
+    files = _tree(tmp_path, ["chart/Chart.yaml", "chart/templates/a.yaml",
+                             "chart/templates/b.yaml", "other/c.yaml"])
+    assert runner.group_by_file(files[:2]) == {f: [f] for f in files[:2]}
+    assert runner.group_by_chart(files) == {"chart": files[:3]}
+
+
+def test_hook_spec() -> None:
+    """Test how a spec expands its command for every group."""
+    spec = runner.HookSpec(["tool", "--in", "{dir}", "{files}"], chdir=True,
+                           header="{dir}:\n", pattern=r"\.py$")
+    tasks = spec.tasks(["a/x.py", "a/y.txt", "b/z.py", "a/w.py"])
+    assert tasks == [
+        runner.Task("a", [["tool", "--in", "a", "a/x.py", "a/w.py"]], "a",
+                    "a:\n"),
+        runner.Task("b", [["tool", "--in", "b", "b/z.py"]], "b", "b:\n"),
+    ]
+
+
+def test_timing() -> None:
+    """Test that the duration of each task follows its output."""
+    out = io.BytesIO()
+    runner.run_tasks([runner.Task("t", [["true"]])], out=out, timing=True)
+    assert re.fullmatch(rb"--> 't' took \d+\.\d\ds\n", out.getvalue())
+
+
+def test_hook_entries() -> None:
+    """Test that every runner entry of the hooks config is a known hook."""
+    config = (HOOKS.parent / ".pre-commit-hooks.yaml").read_text()
+    entries = re.findall(r"^\s*entry: hooks/runner\.py (\S+)$", config,
+                         re.MULTILINE)
+    assert len(entries) == 14
+    for hook in entries:
+        assert hook in runner.HOOKS or hook in runner.MODULE_HOOKS
+
+
+def test_module_hook_dispatch(tmp_path: Path) -> None:
+    """Test that the runner script dispatches to hooks with a module."""
+    bin_dir = tmp_path / "bin"
+    make_stub(bin_dir, "shellcheck")
+    _tree(tmp_path, ["a.sh"])
+    (tmp_path / "a.sh").write_text("#!/bin/sh\n")
+    proc = subprocess.run([str(HOOKS / "runner.py"), "shellcheck", "a.sh"],
+                          cwd=tmp_path, env=stub_env(bin_dir))
+    assert proc.returncode == 0
+    assert calls(bin_dir, "shellcheck") == [[str(tmp_path), "a.sh"]]
@@ -0,0 +1,46 @@
+"""Test the shellcheck hook with a fake shellcheck."""
+
+import subprocess
+from pathlib import Path
+
+from hooks import shellcheck
+from test.tool_stubs import calls, make_stub, stub_env
+
+HOOK = Path(__file__).resolve().parent.parent / "hooks" / "shellcheck.sh"
+
+
+def test_shebangs(tmp_path: Path) -> None:
+    """Test shebang detection from the first line."""
+    cases = {
+        "bash": b"#!/bin/bash\necho", "env": b"#!/usr/bin/env bash\n",
+        "sh": b"#!/bin/sh", "bats": b"#!/usr/bin/env bats\n",
+        "crlf": b"#!/bin/ksh\r\n", "python": b"#!/usr/bin/env python3\n",
+        "none": b"echo #!/bin/bash\n", "empty": b"",
+    }
+    detected = []
+    for name, content in cases.items():
+        (tmp_path / name).write_bytes(content)
+        if shellcheck.has_shell_shebang(str(tmp_path / name)):
+            detected.append(name)
+    assert detected == ["bash", "env", "sh", "bats", "crlf"]
+
+
+def test_scripts_checked_in_chunks(tmp_path: Path) -> None:
+    """Test that scripts are checked by one process per chunk."""
+    bin_dir = tmp_path / "bin"
+    make_stub(bin_dir, "shellcheck")
+    scripts = [f"s{i}.sh" for i in range(5)]
+    for name in scripts:
+        (tmp_path / name).write_text("#!/bin/bash\n")
+    (tmp_path / "tool.py").write_text("#!/usr/bin/env python3\n")
+    (tmp_path / "lib.sh").write_text("echo\n")
+    proc = subprocess.run(
+        [str(HOOK), "--jobs", "2", "--enable require-variable-braces",
+         "tool.py", "lib.sh"] + scripts,
+        cwd=tmp_path, env=stub_env(bin_dir), capture_output=True)
+    assert proc.returncode == 1
+    assert proc.stdout == b"lib.sh: missing shebang\n"
+    assert sorted(call[1:] for call in calls(bin_dir, "shellcheck")) == [
+        ["--enable=require-variable-braces"] + scripts[:3],
+        ["--enable=require-variable-braces"] + scripts[3:],
+    ]
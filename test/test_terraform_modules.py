@@ -0,0 +1,97 @@
+"""Test the index of the local modules Terraform modules call."""
+
+from pathlib import Path
+from typing import Dict
+
+from hooks import terraform_modules
+
+MAIN = """module "net" {
+  source = "./modules/net"
+  tags   = { name = "x" }
+}
+
+module "remote" {
+  source  = "terraform-aws-modules/vpc/aws"
+  version = "5.0"
+}
+
+# module "old" { source = "../old" }
+"""
+
+
+def _write(root: Path, files: Dict[str, str]) -> None:
+    for name, content in files.items():
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_text(content)
+
+
+def test_local_sources() -> None:
+    """Test that only the local sources of module blocks are returned."""
+    assert terraform_modules.local_sources(MAIN, "live") == [
+        "live/modules/net"]
+    assert terraform_modules.local_sources(MAIN, ".") == ["modules/net"]
+
+
+def test_affected_roots() -> None:
+    """Test that callers are followed up to the root modules."""
+    index = {
+        "a/main.tf": ["modules/x"],
+        "b/main.tf": ["modules/x", "modules/y"],
+        "modules/x/main.tf": ["modules/y"],
+        "modules/y/main.tf": [],
+        "modules/y/vars.tf": [],
+        "standalone/main.tf": [],
+    }
+    assert terraform_modules.affected_roots(
+        ["modules/y/vars.tf"], index) == ["a", "b"]
+    assert terraform_modules.affected_roots(
+        ["a/main.tf", "standalone/main.tf"], index) == ["a", "standalone"]
+    assert terraform_modules.affected_roots(["docs/readme.tf"], index) == []
+
+
+def test_affected_roots_cycle() -> None:
+    """Test that modules calling each other do not loop."""
+    index = {"a/main.tf": ["b"], "b/main.tf": ["a"], "c/main.tf": ["a"]}
+    assert terraform_modules.affected_roots(["a/main.tf"], index) == ["c"]
+
+
+def test_load_index_incremental(tmp_path: Path, monkeypatch) -> None:
+    """Test that only new, modified and changed files are parsed again."""
+    root = tmp_path / "repo"
+    _write(root, {"main.tf": MAIN, "modules/net/main.tf": "",
+                  ".terraform/modules/x/main.tf": MAIN})
+    path = tmp_path / "index.json"
+    parsed = []
+    local_sources = terraform_modules.local_sources
+
+    def _record(content: str, directory: str) -> list:
+        parsed.append(directory)
+        return local_sources(content, directory)
+
+    monkeypatch.setattr(terraform_modules, "local_sources", _record)
+    index = terraform_modules.load_index(str(root), path=path)
+    assert index == {"main.tf": ["modules/net"], "modules/net/main.tf": []}
+    assert sorted(parsed) == [".", "modules/net"]
+
+    parsed.clear()
+    assert terraform_modules.load_index(str(root), path=path) == index
+    assert parsed == []
+
+    _write(root, {"modules/net/main.tf": 'module "a" { source = "../a" }\n',
+                  "modules/a/main.tf": ""})
+    index = terraform_modules.load_index(str(root), ["main.tf"], path=path)
+    assert index["modules/net/main.tf"] == ["modules/a"]
+    assert sorted(parsed) == [".", "modules/a", "modules/net"]
+
+    (root / "modules/a/main.tf").unlink()
+    assert "modules/a/main.tf" not in terraform_modules.load_index(
+        str(root), path=path)
+
+
+def test_called_modules() -> None:
+    """Test that modules called through other modules are included."""
+    index = {"a/main.tf": ["modules/x"], "modules/x/main.tf": ["modules/y"],
+             "modules/y/main.tf": ["modules/x"], "b/main.tf": []}
+    assert terraform_modules.called_modules("a", index) == [
+        "modules/x", "modules/y"]
+    assert terraform_modules.called_modules("b", index) == []
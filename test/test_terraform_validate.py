@@ -0,0 +1,136 @@
+"""Test the terraform-validate hook with a fake terraform."""
+
+import subprocess
+from pathlib import Path
+
+from test.tool_stubs import calls, make_stub, stub_env
+
+HOOK = Path(__file__).resolve().parent.parent / "hooks" / "terraform-validate.sh"
+TERRAFORM_STUB = """
+if args[0] == "init":
+    print("plugin cache: " + os.environ.get("TF_PLUGIN_CACHE_DIR", ""))
+    os.makedirs(".terraform", exist_ok=True)
+if args[0] == "validate" and os.path.exists("invalid.tf"):
+    print("Error: invalid")
+    sys.exit(1)
+"""
+PROVIDERS = """terraform {
+  required_providers {
+    aws = { source = "hashicorp/aws", version = "%s" }
+  }
+}
+"""
+
+
+def _run(tmp_path: Path, files: list) -> subprocess.CompletedProcess:
+    env = stub_env(tmp_path / "bin")
+    env["TF_PLUGIN_CACHE_DIR"] = str(tmp_path / "plugins")
+    env["XDG_CACHE_HOME"] = str(tmp_path / "cache")
+    return subprocess.run([str(HOOK), "--jobs", "2"] + files, cwd=tmp_path,
+                          env=env, capture_output=True)
+
+
+def _commands(tmp_path: Path) -> list:
+    return sorted((Path(cwd).name, args[0])
+                  for cwd, *args in calls(tmp_path / "bin", "terraform"))
+
+
+def test_validate_and_skip_init(tmp_path: Path) -> None:
+    """Test that init only runs again when the requirements change."""
+    make_stub(tmp_path / "bin", "terraform", TERRAFORM_STUB)
+    for module in ["a", "b"]:
+        (tmp_path / module).mkdir()
+        (tmp_path / module / "main.tf").write_text(PROVIDERS % "5.0")
+    files = ["a/main.tf", "b/main.tf", "a/main.tf"]
+    proc = _run(tmp_path, files)
+    assert proc.returncode == 0
+    assert f"plugin cache: {tmp_path / 'plugins'}" in proc.stdout.decode()
+    assert _commands(tmp_path) == [("a", "init"), ("a", "validate"),
+                                   ("b", "init"), ("b", "validate")]
+    (tmp_path / "bin" / "terraform.log").unlink()
+    (tmp_path / "b" / "main.tf").write_text(PROVIDERS % "5.1")
+    (tmp_path / "a" / "variables.tf").write_text('variable "x" {}\n')
+    proc = _run(tmp_path, files)
+    assert proc.returncode == 0
+    assert "'a' took" in proc.stdout.decode()
+    assert _commands(tmp_path) == [("a", "validate"), ("b", "init"),
+                                   ("b", "validate")]
+
+
+def test_invalid_directory(tmp_path: Path) -> None:
+    """Test that every directory is validated and the worst status wins."""
+    make_stub(tmp_path / "bin", "terraform", TERRAFORM_STUB)
+    for module in ["bad", "good"]:
+        (tmp_path / module).mkdir()
+        (tmp_path / module / "main.tf").write_text("")
+    (tmp_path / "bad" / "invalid.tf").write_text("")
+    proc = _run(tmp_path, ["bad/invalid.tf", "good/main.tf"])
+    assert proc.returncode == 1
+    output = proc.stdout.decode()
+    assert output.index("Error: invalid") < output.index("'good'")
+    assert ("good", "validate") in _commands(tmp_path)
+
+
+def test_validate_callers(tmp_path: Path) -> None:
+    """Test that root modules calling a changed module are validated."""
+    make_stub(tmp_path / "bin", "terraform", TERRAFORM_STUB)
+    for module in ["app", "api", "modules/shared", "modules/base"]:
+        (tmp_path / module).mkdir(parents=True)
+    (tmp_path / "modules/base/main.tf").write_text("")
+    (tmp_path / "modules/shared/main.tf").write_text(
+        'module "base" {\n  source = "../base"\n}\n')
+    for module in ["app", "api"]:
+        (tmp_path / module / "main.tf").write_text(
+            'module "shared" {\n  source = "../modules/shared"\n}\n')
+    proc = _run(tmp_path, ["modules/base/main.tf", "app/main.tf"])
+    assert proc.returncode == 0
+    assert _commands(tmp_path) == [("api", "init"), ("api", "validate"),
+                                   ("app", "init"), ("app", "validate")]
+
+
+def test_init_after_called_module_change(tmp_path: Path) -> None:
+    """Test that init runs again when a called module requires more."""
+    make_stub(tmp_path / "bin", "terraform", TERRAFORM_STUB)
+    for module in ["app", "modules/shared", "modules/base"]:
+        (tmp_path / module).mkdir(parents=True)
+        (tmp_path / module / "main.tf").write_text("")
+    (tmp_path / "app" / "main.tf").write_text(
+        'module "shared" {\n  source = "../modules/shared"\n}\n')
+    assert _run(tmp_path, ["app/main.tf"]).returncode == 0
+    (tmp_path / "bin" / "terraform.log").unlink()
+    (tmp_path / "modules/shared/variables.tf").write_text('variable "x" {}\n')
+    assert _run(tmp_path, ["modules/shared/variables.tf"]).returncode == 0
+    assert _commands(tmp_path) == [("app", "validate")]
+    (tmp_path / "bin" / "terraform.log").unlink()
+    (tmp_path / "modules/shared/main.tf").write_text(
+        'module "base" {\n  source = "../base"\n}\n')
+    proc = _run(tmp_path, ["modules/shared/main.tf"])
+    assert proc.returncode == 0
+    assert "(init done)" in proc.stdout.decode()
+    assert _commands(tmp_path) == [("app", "init"), ("app", "validate")]
+
+
+def test_init_after_new_implied_provider(tmp_path: Path) -> None:
+    """Test that init runs again for providers only resources imply."""
+    make_stub(tmp_path / "bin", "terraform", TERRAFORM_STUB)
+    for module in ["app", "modules/shared"]:
+        (tmp_path / module).mkdir(parents=True)
+    (tmp_path / "modules/shared/main.tf").write_text("")
+    main = ('module "shared" {\n  source = "../modules/shared"\n}\n'
+            'resource "aws_s3_bucket" "a" {}\n')
+    (tmp_path / "app" / "main.tf").write_text(main)
+    assert _run(tmp_path, ["app/main.tf"]).returncode == 0
+    for fpath, added, init in [
+            ("app/main.tf", 'resource "aws_sqs_queue" "q" {}\n', False),
+            ("app/main.tf", 'resource "google_storage_bucket" "b" {}\n',
+             True),
+            ("app/main.tf", 'provider "google" {\n  region = "x"\n}\n', True),
+            ("modules/shared/main.tf", 'data "random_id" "i" {}\n', True)]:
+        (tmp_path / "bin" / "terraform.log").unlink()
+        with open(tmp_path / fpath, "a") as f:
+            f.write(added)
+        assert _run(tmp_path, [fpath]).returncode == 0
+        expected = [("app", "validate")]
+        if init:
+            expected.insert(0, ("app", "init"))
+        assert _commands(tmp_path) == expected, added
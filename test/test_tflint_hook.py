@@ -0,0 +1,67 @@
+"""Test the tflint hook with a fake tflint."""
+
+import shutil
+import subprocess
+from pathlib import Path
+
+from test.tool_stubs import calls, make_stub, stub_env
+
+HOOK = Path(__file__).resolve().parent.parent / "hooks" / "tflint.sh"
+TFLINT_STUB = """
+if args == ["--init"]:
+    os.makedirs(os.path.join(os.environ["TFLINT_PLUGIN_DIR"], "github.com"),
+                exist_ok=True)
+if "bad.tf" in args:
+    print("Warning: bad")
+    sys.exit(2)
+"""
+
+
+def _run(tmp_path: Path, args: list) -> subprocess.CompletedProcess:
+    env = stub_env(tmp_path / "bin")
+    env["XDG_CACHE_HOME"] = str(tmp_path / "cache")
+    env["TFLINT_PLUGIN_DIR"] = str(tmp_path / "plugins")
+    return subprocess.run([str(HOOK)] + args, cwd=tmp_path / "repo", env=env,
+                          capture_output=True)
+
+
+def test_one_run_per_directory(tmp_path: Path) -> None:
+    """Test that files are linted per directory and init is remembered."""
+    make_stub(tmp_path / "bin", "tflint", TFLINT_STUB)
+    (tmp_path / "repo").mkdir()
+    (tmp_path / "repo" / ".tflint.hcl").write_text('plugin "aws" {}\n')
+    args = ["--module", "a/main.tf", "b/bad.tf", "a/vars.tf"]
+    proc = _run(tmp_path, args)
+    assert proc.returncode == 2
+    assert proc.stdout == b"Warning: bad\n"
+    assert sorted(c[1:] for c in calls(tmp_path / "bin", "tflint")) == [
+        ["--init"],
+        ["--module", "--chdir", "a", "--filter", "main.tf",
+         "--filter", "vars.tf"],
+        ["--module", "--chdir", "b", "--filter", "bad.tf"],
+    ]
+
+    (tmp_path / "bin" / "tflint.log").unlink()
+    _run(tmp_path, ["a/main.tf"])
+    assert [c[1:] for c in calls(tmp_path / "bin", "tflint")] == [
+        ["--chdir", "a", "--filter", "main.tf"]]
+
+    (tmp_path / "bin" / "tflint.log").unlink()
+    (tmp_path / "repo" / ".tflint.hcl").write_text('plugin "google" {}\n')
+    _run(tmp_path, ["a/main.tf"])
+    assert [c[1:] for c in calls(tmp_path / "bin", "tflint")][0] == ["--init"]
+
+
+def test_init_after_plugins_removed(tmp_path: Path) -> None:
+    """Test that init runs again when the plugin directory was cleared."""
+    make_stub(tmp_path / "bin", "tflint", TFLINT_STUB)
+    (tmp_path / "repo").mkdir()
+    (tmp_path / "repo" / ".tflint.hcl").write_text('plugin "aws" {}\n')
+    _run(tmp_path, ["main.tf"])
+    (tmp_path / "bin" / "tflint.log").unlink()
+    _run(tmp_path, ["main.tf"])
+    assert ["--init"] not in [c[1:] for c in calls(tmp_path / "bin", "tflint")]
+    shutil.rmtree(tmp_path / "plugins")
+    _run(tmp_path, ["main.tf"])
+    assert [c[1:] for c in calls(tmp_path / "bin", "tflint")][-2] == [
+        "--init"]
@@ -0,0 +1,58 @@
+"""Test finding files to scan under a directory."""
+
+import subprocess
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from hooks import check_pep672_ascii, walk
+
+
+def _tree(root: Path, names: List[str]) -> None:
+    for name in names:
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_text("x = 1\n")
+
+
+NAMES = ["a.py", "b.txt", "pkg/c.py", "pkg/deep/d.cc", "node_modules/m.py",
+         "pkg/vendor/v.py", ".tox/t.py", "build/out.py", ".hidden.py"]
+
+
+def _found(root: Path, recursive: bool = True) -> List[str]:
+    return sorted(str(p.relative_to(root)) for p in
+                  walk.find_files(root, [".py", ".cc"], recursive))
+
+
+def test_scandir(tmp_path: Path) -> None:
+    """Test pruning and extensions outside a git repository."""
+    _tree(tmp_path, NAMES + [".gitignore"])
+    (tmp_path / ".gitignore").write_text("build/\n")
+    assert _found(tmp_path) == [".hidden.py", "a.py", "build/out.py",
+                                "pkg/c.py", "pkg/deep/d.cc"]
+    assert _found(tmp_path, recursive=False) == [".hidden.py", "a.py"]
+
+
+def test_git(tmp_path: Path) -> None:
+    """Test that ignored files and deleted tracked files are skipped."""
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    _tree(tmp_path, NAMES + [".gitignore", "tracked.py"])
+    (tmp_path / ".gitignore").write_text("build/\n")
+    subprocess.run(["git", "add", "tracked.py", "a.py"], cwd=tmp_path,
+                   check=True)
+    (tmp_path / "tracked.py").unlink()
+    assert _found(tmp_path) == [".hidden.py", "a.py", "pkg/c.py",
+                                "pkg/deep/d.cc"]
+    assert _found(tmp_path / "pkg") == ["c.py", "deep/d.cc"]
+
+
+def test_scan_files_recursive(tmp_path: Path) -> None:
+    """Test that recursive scans skip pruned directories."""
+    _tree(tmp_path, ["ok.py"])
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "bad.py").write_text("x = '\u2066'\n",
+                                                       encoding="utf-8")
+    check_pep672_ascii.scan_files([tmp_path], True, False, [".py"])
+    (tmp_path / "node_modules" / "bad.py").rename(tmp_path / "bad.py")
+    with pytest.raises(UnicodeError):
+        check_pep672_ascii.scan_files([tmp_path], True, False, [".py"])
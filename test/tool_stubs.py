@@ -0,0 +1,45 @@
+"""Fake tool executables that record how the hooks invoke them."""
+
+import json
+import os
+import stat
+import sys
+from pathlib import Path
+from typing import List
+
+STUB = """#!{python}
+import json, os, sys
+args = sys.argv[1:]
+with open({log!r}, "a") as f:
+    f.write(json.dumps([os.getcwd()] + args) + "\\n")
+{body}
+"""
+
+
+def make_stub(bin_dir: Path, name: str, body: str = "") -> Path:
+    """Write an executable ``name`` to bin_dir that logs its calls.
+
+    ``body`` is Python code run after logging, with the arguments in
+    ``args``, e.g. to print output or exit with an error.
+    """
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    stub = bin_dir / name
+    stub.write_text(STUB.format(python=sys.executable,
+                                log=str(bin_dir / f"{name}.log"), body=body))
+    stub.chmod(stub.stat().st_mode | stat.S_IEXEC)
+    return stub
+
+
+def calls(bin_dir: Path, name: str) -> List[List[str]]:
+    """Return the working directory and arguments of every call of a stub."""
+    log = bin_dir / f"{name}.log"
+    if not log.exists():
+        return []
+    return [json.loads(line) for line in log.read_text().splitlines()]
+
+
+def stub_env(bin_dir: Path) -> dict:
+    """Return an environment with the stubs first on PATH."""
+    env = dict(os.environ)
+    env["PATH"] = f"{bin_dir}{os.pathsep}{env['PATH']}"
+    return env